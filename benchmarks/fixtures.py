@@ -0,0 +1,87 @@
+from __future__ import annotations
+import html
+import random
+import re
+import time
+from typing import Dict, List
+
+from utils.reporting import load_all_reports
+
+FEEDS = [
+    {"id": 1, "title": "生信技能树"},
+    {"id": 2, "title": "BioAI Weekly"},
+    {"id": 3, "title": "Genome Research News"},
+    {"id": 4, "title": "单细胞天地"},
+    {"id": 5, "title": "Industry Digest"},
+]
+
+_NOISE = (
+    "<nav><a href='/'>首页</a> | <a href='/about'>关于</a></nav>"
+    "<script>window.__track && window.__track('view');</script>"
+    "<style>.ad{display:none}</style>"
+)
+
+
+def corpus_articles() -> List[Dict]:
+    """data/reports 中已有的文章（title / content_text / filter_data / ai_analysis）"""
+    seen = set()
+    out: List[Dict] = []
+    for report in load_all_reports():
+        for art in report.get("articles", []):
+            if art.get("link") in seen or not art.get("content_text"):
+                continue
+            seen.add(art.get("link"))
+            out.append(art)
+    return out
+
+
+def _sentences(text: str) -> List[str]:
+    return [s for s in re.split(r"(?<=[。！？.!?])\s*", text) if s.strip()]
+
+
+def to_html(title: str, text: str) -> str:
+    """把纯文本包装成带导航/脚本噪声的公众号风格 HTML"""
+    paragraphs = "".join(f"<p>{html.escape(p)}</p>" for p in text.split("\n") if p.strip())
+    return f"<article><h1>{html.escape(title)}</h1>{_NOISE}<section>{paragraphs}</section></article>"
+
+
+def build_items(size: int, duplicate_ratio: float = 0.3, days: int = 7, seed: int = 42) -> List[Dict]:
+    """生成 size 条 Fever API 条目。
+
+    以历史文章为模板：非重复条目的正文由多篇文章的句子重组，保证去重后仍有足够的独立文章；
+    duplicate_ratio 比例的条目复制已生成条目（改写标题），用于覆盖去重路径。
+    每条附带 _analysis（回放用的 step2 结果）供 LLM 桩使用。"""
+    rng = random.Random(seed)
+    corpus = corpus_articles()
+    if not corpus:
+        raise RuntimeError("data/reports 中没有可用的文章作为基准数据")
+    pool = [s for art in corpus for s in _sentences(art["content_text"])]
+    now = int(time.time())
+
+    items: List[Dict] = []
+    for idx in range(size):
+        base = corpus[idx % len(corpus)]
+        if items and rng.random() < duplicate_ratio:
+            src = rng.choice(items)
+            title = src["title"] + "（转载）"
+            text = src["_text"]
+        else:
+            title = f"{base['title']} #{idx}"
+            text = "\n".join(rng.sample(pool, k=min(len(pool), 12)))
+        items.append(
+            {
+                "id": idx + 1,
+                "feed_id": FEEDS[idx % len(FEEDS)]["id"],
+                "title": title,
+                "author": "bench",
+                "html": to_html(title, text),
+                "url": f"https://bench.local/a/{idx + 1}",
+                "is_saved": 0,
+                "is_read": 0,
+                "created_on_time": now - rng.randint(0, days * 86400 - 3600),
+                "_text": text,
+                "_analysis": dict(base.get("ai_analysis", {})),
+                "_filter": dict(base.get("filter_data", {"pass": True, "value": 3})),
+            }
+        )
+    return items
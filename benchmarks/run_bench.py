@@ -0,0 +1,278 @@
+"""离线基准：用本地 FreshRSS / LLM 桩服务回放数据，测量 core.run_pipeline 的吞吐、各阶段延迟与内存峰值。
+
+用法（在仓库根目录）：
+    python -m benchmarks.run_bench --sizes 100,1000,10000
+    python -m benchmarks.run_bench --latency 0.05 --error-rate 0.02 --malformed-rate 0.05
+    python -m benchmarks.run_bench --save-baseline            # 记录基线到 benchmarks/baseline.json
+    python -m benchmarks.run_bench --compare                  # 与基线比较，出现回退时退出码为 1
+    python -m benchmarks.run_bench --fetch-only --max-count 100 --sizes 1000,10000,30000   # 未读积压增长时的抓取内存
+"""
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from benchmarks.stub_servers import BENCH_PROMPTS, StubOptions, server_process
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+STAGES = {
+    "fetch": "fetch_rss_articles",
+    "dedup": "deduplicate_articles",
+    "step1": "step1_filter_articles",
+    "step2": "step2_deep_analyze",
+    "step3": "step3_global_summary",
+}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _bench_cfg(size: int, fever_port: int, llm_port: int, args) -> Dict:
+    return {
+        "FRESHRSS_HOST": f"http://127.0.0.1:{fever_port}",
+        "FRESHRSS_USER": "bench",
+        "FRESHRSS_PASS": "bench",
+        "LLM_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "LLM_MODEL": "bench",
+        "LLM_API_KEY": "bench",
+        "FETCH_DAYS": 7,
+        "FETCH_MAX_COUNT": args.max_count or size,
+        "DEDUP_THRESHOLD": 0.65,
+        "SOURCE_RANKING": False,
+        "SEMANTIC_DEDUP": args.semantic,
+        "EMBEDDING_MODEL": "bench" if args.semantic else None,
+    }
+
+
+def _measure(size: int, fever_port: int, llm_port: int, args, results) -> None:
+    """子进程入口：插桩 core 后运行一次完整流程，结果写入 results 队列"""
+    import requests
+
+    import core
+
+    stage_stats: Dict[str, Dict] = {}
+    call_latency: Dict[str, List[float]] = {}
+    current = {"stage": "setup"}
+
+    def timed_stage(stage: str, func):
+        def wrapper(*a, **kw):
+            current["stage"] = stage
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                return func(*a, **kw)
+            finally:
+                stage_stats[stage] = {
+                    "seconds": round(time.perf_counter() - start, 3),
+                    "peak_traced_mb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1),
+                }
+
+        return wrapper
+
+    def timed_call(func):
+        def wrapper(*a, **kw):
+            start = time.perf_counter()
+            try:
+                return func(*a, **kw)
+            finally:
+                call_latency.setdefault(current["stage"], []).append(time.perf_counter() - start)
+
+        return wrapper
+
+    for stage, name in STAGES.items():
+        setattr(core, name, timed_stage(stage, getattr(core, name)))
+    requests.sessions.Session.request = timed_call(requests.sessions.Session.request)
+
+    make_client = core.get_llm_client
+
+    def instrumented_client(cfg):
+        client = make_client(cfg)
+        client.chat.completions.create = timed_call(client.chat.completions.create)
+        return client
+
+    core.get_llm_client = instrumented_client
+
+    cfg = _bench_cfg(size, fever_port, llm_port, args)
+    tracemalloc.start()
+    start = time.perf_counter()
+    if args.fetch_only:
+        articles = core.fetch_rss_articles(cfg)
+        report = {"meta": {"total_raw": len(articles)}, "articles": articles}
+    else:
+        report = core.run_pipeline("Bench", BENCH_PROMPTS, cfg=cfg)
+    total = time.perf_counter() - start
+    peak_traced = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    meta = report.get("meta", {})
+    results.put(
+        {
+            "size": size,
+            "total_seconds": round(total, 3),
+            "throughput_articles_per_s": round(size / total, 2) if total else 0.0,
+            "peak_traced_mb": round(peak_traced / 2**20, 1),
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": stage_stats,
+            "calls": {
+                stage: {
+                    "count": len(values),
+                    "p50_ms": round(_percentile(values, 0.5) * 1000, 2),
+                    "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+                }
+                for stage, values in call_latency.items()
+            },
+            "pipeline": {
+                "total_raw": meta.get("total_raw"),
+                "total_unique": meta.get("total_unique"),
+                "total_passed": meta.get("total_passed"),
+                "analyzed": len(report.get("articles", [])),
+                "budget": meta.get("budget"),
+                "parse_stats": meta.get("parse_stats"),
+            },
+        }
+    )
+
+
+def run_size(size: int, args) -> Dict:
+    """为单个规模启动独立的桩服务进程与测量进程，保证内存峰值互不干扰"""
+    ctx = mp.get_context("spawn")
+    options = StubOptions(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        pass_rate=args.pass_rate,
+        tokens_per_call=args.tokens_per_call,
+    )
+    ports, stop, results = ctx.Queue(), ctx.Event(), ctx.Queue()
+    server = ctx.Process(target=server_process, args=(size, args.duplicate_ratio, options, ports, stop), daemon=True)
+    server.start()
+    try:
+        fever_port, llm_port = ports.get(timeout=600)
+        worker = ctx.Process(target=_measure, args=(size, fever_port, llm_port, args, results))
+        worker.start()
+        while True:
+            try:
+                result = results.get(timeout=1)
+                break
+            except queue.Empty:
+                if not worker.is_alive():
+                    raise RuntimeError(f"测量进程异常退出 (size={size}, exitcode={worker.exitcode})")
+        worker.join()
+        return result
+    finally:
+        stop.set()
+        server.join(timeout=10)
+
+
+def compare(current: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """与基线比较：吞吐下降、总耗时/阶段耗时或内存峰值上升超过 tolerance 视为回退"""
+    regressions: List[str] = []
+    base_by_size = {b["size"]: b for b in baseline}
+    for cur in current:
+        base = base_by_size.get(cur["size"])
+        if not base:
+            continue
+        size = cur["size"]
+        if cur["throughput_articles_per_s"] < base["throughput_articles_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"[{size}] throughput {cur['throughput_articles_per_s']} < baseline {base['throughput_articles_per_s']}"
+            )
+        for key in ("peak_rss_mb", "peak_traced_mb"):
+            if cur.get(key) and base.get(key) and cur[key] > base[key] * (1 + tolerance):
+                regressions.append(f"[{size}] {key} {cur[key]} > baseline {base[key]}")
+        for stage, stats in cur["stages"].items():
+            old = base.get("stages", {}).get(stage)
+            # 小于 50ms 的阶段抖动较大，不参与比较
+            if old and stats["seconds"] > max(old["seconds"] * (1 + tolerance), old["seconds"] + 0.05):
+                regressions.append(f"[{size}] {stage} {stats['seconds']}s > baseline {old['seconds']}s")
+    return regressions
+
+
+def _print_result(res: Dict) -> None:
+    print(
+        f"\n== {res['size']} articles: {res['total_seconds']}s, "
+        f"{res['throughput_articles_per_s']} articles/s, "
+        f"peak traced {res['peak_traced_mb']} MB, peak RSS {res['peak_rss_mb']} MB"
+    )
+    for stage, stats in res["stages"].items():
+        calls = res["calls"].get(stage, {})
+        call_text = f" | calls {calls['count']} p50 {calls['p50_ms']}ms p95 {calls['p95_ms']}ms" if calls else ""
+        print(f"   {stage:<6} {stats['seconds']:>8}s  peak {stats['peak_traced_mb']:>7} MB{call_text}")
+    pipe = res["pipeline"]
+    print(
+        f"   raw {pipe['total_raw']} → unique {pipe['total_unique']} → passed {pipe['total_passed']} "
+        f"→ analyzed {pipe['analyzed']}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AutoRSS 离线基准")
+    parser.add_argument("--sizes", default="100,1000,10000", help="逗号分隔的文章规模")
+    parser.add_argument("--latency", type=float, default=0.0, help="桩服务平均响应延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="桩服务返回 500 的比例")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="LLM 返回截断 JSON 的比例")
+    parser.add_argument("--pass-rate", type=float, default=0.7, help="步骤1 通过比例")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="重复文章比例")
+    parser.add_argument("--tokens-per-call", type=int, default=0, help="每次调用上报的 token 数（0 按文本长度估算）")
+    parser.add_argument("--semantic", action="store_true", help="开启语义去重（走桩服务的 embeddings 接口）")
+    parser.add_argument("--max-count", type=int, default=0, help="FETCH_MAX_COUNT（0 表示等于规模）")
+    parser.add_argument("--fetch-only", action="store_true", help="只测量抓取阶段")
+    parser.add_argument("--output", help="结果写入 JSON 文件")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基线文件路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--compare", action="store_true", help="与基线比较，出现回退时返回 1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="回退判定的相对容差")
+    args = parser.parse_args(argv)
+
+    results: List[Dict] = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        res = run_size(size, args)
+        _print_result(res)
+        results.append(res)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存: {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\n基线不存在: {args.baseline}")
+            return 1
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ 性能回退:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("\n✅ 未发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import FEEDS
+
+# 基准提示词：用固定标记让 LLM 桩识别步骤与文章
+BENCH_PROMPTS = {
+    "step1": "[STEP1] 判断是否相关，返回JSON。TITLE<<{title}>>\n{content}",
+    "step2": "[STEP2] 总结并打分，返回JSON。TITLE<<{title}>>\n{content}",
+    "step3": "[STEP3] 根据以下文章生成简报：{context}",
+}
+_TITLE_RE = re.compile(r"TITLE<<(.*?)>>", re.S)
+
+
+class StubOptions:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        pass_rate: float = 0.7,
+        tokens_per_call: int = 0,
+        seed: int = 7,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.pass_rate = pass_rate
+        self.tokens_per_call = tokens_per_call
+        self.seed = seed
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handler, items: List[Dict], options: StubOptions):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.items = items
+        self.by_id = {item["id"]: item for item in items}
+        self.by_title = {item["title"]: item for item in items}
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.lock = threading.Lock()
+
+    def delay(self) -> None:
+        opts = self.options
+        if opts.latency > 0:
+            with self.lock:
+                factor = 1 + self.rng.uniform(-opts.jitter, opts.jitter)
+            time.sleep(max(0.0, opts.latency * factor))
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _StubServer
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # 头部与正文分两次写出，关闭 Nagle 避免与延迟 ACK 叠加出约 40ms 的假延迟
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, payload) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FeverHandler(_Handler):
+    """FreshRSS Fever API 桩：api / feeds / unread_item_ids / items?with_ids="""
+
+    def do_POST(self):
+        self._body()
+        query = parse_qs(urlparse(self.path).query, keep_blank_values=True)
+        srv = self.server
+        srv.delay()
+        if srv.roll(srv.options.error_rate):
+            self._send(500, {"error": "stub error"})
+            return
+        payload: Dict = {"api_version": 3, "auth": 1}
+        if "feeds" in query:
+            payload["feeds"] = [dict(f, url="", site_url="", is_spark=0, last_updated_on_time=0) for f in FEEDS]
+        elif "unread_item_ids" in query:
+            payload["unread_item_ids"] = ",".join(str(i["id"]) for i in srv.items)
+        elif "items" in query:
+            ids = [int(x) for x in query.get("with_ids", [""])[0].split(",") if x]
+            payload["items"] = [
+                {k: v for k, v in srv.by_id[i].items() if not k.startswith("_")} for i in ids if i in srv.by_id
+            ]
+        self._send(200, payload)
+
+
+class LLMHandler(_Handler):
+    """OpenAI 兼容接口桩：/chat/completions 回放历史分析结果，/embeddings 返回本地哈希向量"""
+
+    def do_POST(self):
+        req = json.loads(self._body() or b"{}")
+        srv = self.server
+        srv.delay()
+        if srv.roll(srv.options.error_rate):
+            self._send(500, {"error": {"message": "stub error", "type": "server_error"}})
+            return
+        if self.path.endswith("/embeddings"):
+            self._send(200, self._embeddings(req))
+        else:
+            self._send(200, self._chat(req))
+
+    def _usage(self, prompt: str, content: str) -> Dict[str, int]:
+        fixed = self.server.options.tokens_per_call
+        prompt_tokens = fixed // 2 if fixed else len(prompt) // 2
+        completion_tokens = fixed - prompt_tokens if fixed else len(content) // 2
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _answer(self, prompt: str) -> Tuple[str, Optional[Dict]]:
+        match = _TITLE_RE.search(prompt)
+        item = self.server.by_title.get(match.group(1)) if match else None
+        if "[STEP1]" in prompt:
+            digest = int(hashlib.md5(prompt[:200].encode("utf-8")).hexdigest()[:8], 16)
+            if digest % 1000 >= self.server.options.pass_rate * 1000:
+                return "step1", {"ignore": True, "value": 0, "reason": "bench: 不相关"}
+            return "step1", dict((item or {}).get("_filter") or {"pass": True, "value": 3}, ignore=False)
+        if "[STEP2]" in prompt:
+            return "step2", dict((item or {}).get("_analysis") or {"summary": "bench", "score": 60})
+        return "step3", None
+
+    def _chat(self, req: Dict) -> Dict:
+        prompt = "".join(m.get("content", "") for m in req.get("messages", []))
+        step, data = self._answer(prompt)
+        if data is None:
+            content = "# Bench Brief\n\n本期共有若干篇文章，以下为要点。"
+        else:
+            content = json.dumps(data, ensure_ascii=False)
+            if self.server.roll(self.server.options.malformed_rate):
+                content = "```json\n" + content[: max(1, len(content) * 2 // 3)]
+        return {
+            "id": f"bench-{step}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": req.get("model", "bench"),
+            "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+            ],
+            "usage": self._usage(prompt, content),
+        }
+
+    def _embeddings(self, req: Dict) -> Dict:
+        from services.semantic import local_embed
+
+        texts = req.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        vectors = local_embed(texts)
+        return {
+            "object": "list",
+            "model": req.get("model", "bench"),
+            "data": [{"object": "embedding", "index": i, "embedding": v.tolist()} for i, v in enumerate(vectors)],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+
+
+def serve(items: List[Dict], options: StubOptions):
+    """在后台线程启动两个桩服务，返回 (fever_server, llm_server)；调用方负责 shutdown()"""
+    servers = (_StubServer(FeverHandler, items, options), _StubServer(LLMHandler, items, options))
+    for srv in servers:
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return servers
+
+
+def server_process(size: int, duplicate_ratio: float, options: StubOptions, ports, stop) -> None:
+    """multiprocessing 入口：生成数据并启动桩服务，把端口写入 ports 队列，直到 stop 被置位"""
+    from benchmarks.fixtures import build_items
+
+    fever, llm = serve(build_items(size, duplicate_ratio=duplicate_ratio), options)
+    ports.put((fever.server_address[1], llm.server_address[1]))
+    stop.wait()
+    fever.shutdown()
+    llm.shutdown()
@@ -1,13 +1,25 @@
-import json
+import copy
+import heapq
 import re
 from datetime import datetime, timezone
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from bs4 import BeautifulSoup
 from freshrss_api import FreshRSSAPI
 from openai import OpenAI
 
+from services.budget import RunBudget
+from services.clients import get_freshrss_client, get_llm_client
 from services.config import get_config
+from services.structured import (
+    DEFAULT_SCHEMAS,
+    ParseStats,
+    coerce_to_schema,
+    field_repair_prompt,
+    get_schema,
+    is_complete,
+    parse_json_lenient,
+)
 
 
 def clean_html(html_content: Optional[str]) -> str:
@@ -17,67 +29,153 @@ def clean_html(html_content: Optional[str]) -> str:
     return soup.get_text(separator="\n", strip=True)
 
 
-def get_llm_client(cfg: Dict) -> OpenAI:
-    return OpenAI(api_key=cfg["LLM_API_KEY"], base_url=cfg["LLM_BASE_URL"])  # type: ignore
+def _feed_titles(client: FreshRSSAPI) -> Dict[int, str]:
+    """feed_id -> 订阅源名称（Fever API 的条目本身不带源名称）"""
+    try:
+        feeds = client.get_feeds().get("feeds", [])
+        return {int(f["id"]): f.get("title") or f"feed-{f['id']}" for f in feeds}
+    except Exception as e:
+        print(f"获取订阅源列表失败: {e}")
+        return {}
 
 
-def fetch_rss_articles(cfg: Dict, days: Optional[int] = None, max_count: Optional[int] = None) -> List[Dict]:
-    """从 FreshRSS 获取源数据"""
+def load_source_values(domain: Optional[str] = None, prior_weight: float = 5.0) -> Tuple[Dict[str, float], float]:
+    """基于历史报告计算各订阅源的期望价值；无历史或计算失败时返回空表"""
+    try:
+        from utils.analytics import load_history_frames, source_expected_value
+
+        values, prior = source_expected_value(load_history_frames(), domain=domain, prior_weight=prior_weight)
+        return values.to_dict(), prior
+    except Exception as e:
+        print(f"订阅源评分不可用: {e}")
+        return {}, 1.0
+
+
+class TopCandidates:
+    """有界小顶堆：按 期望价值 × 时效衰减 只保留前 max_count 个候选。
+    时效按 half_life_hours 指数衰减，高价值源的旧文章不会压过其他源的新文章；
+    per_source_cap > 0 时每个源各自维护不超过 cap 篇的堆，取出时再做全局截断；同分时较新、先到者优先。"""
+
+    def __init__(
+        self,
+        max_count: int,
+        source_values: Optional[Dict[str, float]] = None,
+        prior: float = 1.0,
+        per_source_cap: int = 0,
+        half_life_hours: float = 48.0,
+    ):
+        self.max_count = max_count
+        self.source_values = source_values or {}
+        self.prior = prior
+        self.per_source_cap = per_source_cap
+        self.half_life_hours = half_life_hours
+        self._heaps: Dict[str, List[Tuple]] = {}
+        self._seq = 0
+
+    def push(self, article: Dict, age_hours: float = 0.0) -> None:
+        self._seq += 1
+        value = self.source_values.get(article["source"], self.prior)
+        if self.half_life_hours > 0:
+            value *= 0.5 ** (max(age_hours, 0.0) / self.half_life_hours)
+        key = (value, article["pub_date"], -self._seq)
+        bucket = article["source"] if self.per_source_cap else ""
+        heap = self._heaps.setdefault(bucket, [])
+        limit = min(self.per_source_cap, self.max_count) if self.per_source_cap else self.max_count
+        if len(heap) < limit:
+            heapq.heappush(heap, (key, article))
+        elif heap and key > heap[0][0]:
+            heapq.heapreplace(heap, (key, article))
+
+    def result(self) -> List[Dict]:
+        merged = sorted((item for heap in self._heaps.values() for item in heap), key=lambda x: x[0], reverse=True)
+        return [article for _, article in merged[: self.max_count]]
+
+
+def iter_unread_entries(client: FreshRSSAPI, page_size: int = 50) -> Iterator:
+    """按页拉取未读条目（新条目优先），每页处理完即释放，不一次性物化全部未读。
+    Fever API 单次最多返回 50 条；直接调用 items 接口，而不是 get_items_from_ids：
+    后者在条目拉取期间被删除（返回数少于请求数）时会丢弃整页。请求本身失败时照常抛出 APIError。"""
+    ids_text = client._call("unread_item_ids").get("unread_item_ids", "")
+    ids = sorted((int(i) for i in ids_text.split(",") if i), reverse=True)
+    for start in range(0, len(ids), page_size):
+        batch = ids[start : start + page_size]
+        response = client._call("items", with_ids=",".join(str(i) for i in batch))
+        page = [client._dict_to_item(item) for item in response.get("items", [])]
+        if len(page) < len(batch):
+            print(f"有 {len(batch) - len(page)} 条未读条目已不存在，跳过")
+        page.sort(key=lambda item: item.id, reverse=True)
+        yield from page
+
+
+def fetch_rss_articles(
+    cfg: Dict,
+    days: Optional[int] = None,
+    max_count: Optional[int] = None,
+    domain: Optional[str] = None,
+    skip_links: Optional[Set[str]] = None,
+) -> List[Dict]:
+    """从 FreshRSS 获取源数据：逐页清洗，只在有界堆中保留排名前 max_count 的候选。
+    skip_links 中的链接（已处理过的文章）在入堆前跳过，不占用候选名额。"""
     days = days if days is not None else int(cfg.get("FETCH_DAYS", 7))
     max_count = max_count if max_count is not None else int(cfg.get("FETCH_MAX_COUNT", 100))
 
     print("📡 连接 FreshRSS...")
-    client = FreshRSSAPI(
-        host=cfg["FRESHRSS_HOST"],
-        username=cfg["FRESHRSS_USER"],
-        password=cfg["FRESHRSS_PASS"],
-    )
+    client = get_freshrss_client(cfg)
+
+    if cfg.get("SOURCE_RANKING", True):
+        source_values, prior = load_source_values(domain, prior_weight=float(cfg.get("SOURCE_PRIOR_WEIGHT", 5.0)))
+        top = TopCandidates(
+            max_count or 100,
+            source_values,
+            prior,
+            per_source_cap=int(cfg.get("SOURCE_MAX_PER_FEED", 0)),
+            half_life_hours=float(cfg.get("SOURCE_HALF_LIFE_HOURS", 48)),
+        )
+    else:
+        top = TopCandidates(max_count or 100)
 
-    entries = client.get_unreads()
-    candidates: List[Dict] = []
+    feed_titles = _feed_titles(client)
     now_utc = datetime.now(timezone.utc)
 
-    for entry in entries:
+    skip_links = skip_links or set()
+    for entry in iter_unread_entries(client):
         timestamp = getattr(entry, "created_on_time", 0)
         if not timestamp:
             continue
 
+        link = getattr(entry, "url", getattr(entry, "link", "#"))
+        if link in skip_links:
+            continue
+
         pub_date = datetime.fromtimestamp(timestamp, tz=timezone.utc)
         if (now_utc - pub_date).days > days:
             continue
 
-        raw_html = getattr(entry, "html", "") or ""
-        clean_text = clean_html(raw_html)
+        clean_text = clean_html(getattr(entry, "html", "") or "")
         if len(clean_text) < 50:
             continue
 
-        candidates.append(
+        feed_id = getattr(entry, "feed_id", None)
+        top.push(
             {
                 "title": entry.title,
-                "link": getattr(entry, "url", getattr(entry, "link", "#")),
+                "link": link,
                 "pub_date": pub_date.strftime("%Y-%m-%d %H:%M"),
-                "source": getattr(entry, "feed", {}).get("title", "Unknown"),
+                "source": feed_titles.get(feed_id, "Unknown"),
+                "feed_id": feed_id,
                 "content_text": clean_text,
-            }
+            },
+            age_hours=(now_utc - pub_date).total_seconds() / 3600,
         )
 
-    candidates.sort(key=lambda x: x["pub_date"], reverse=True)
-    return candidates[: max_count or 100]
+    return top.result()
 
 
-def safe_json_parse(response_text: str) -> Dict:
-    """辅助函数：清理 Markdown 标记并解析 JSON"""
-    text = response_text.replace("```json", "").replace("```", "").strip()
-    try:
-        return json.loads(text)
-    except Exception:
-        return {}
+def _token_set(text: str) -> Set[str]:
+    return set(re.split(r"\W+", text.lower()))
 
 
-def calculate_jaccard_similarity(text1: str, text2: str) -> float:
-    """计算两个文本的 Jaccard 相似度 (基于词集合)"""
-    set1 = set(re.split(r"\W+", text1.lower()))
-    set2 = set(re.split(r"\W+", text2.lower()))
+def _jaccard(set1: Set[str], set2: Set[str]) -> float:
     if not set1 or not set2:
         return 0.0
     intersection = len(set1.intersection(set2))
@@ -85,17 +183,26 @@ def calculate_jaccard_similarity(text1: str, text2: str) -> float:
     return intersection / union
 
 
+def calculate_jaccard_similarity(text1: str, text2: str) -> float:
+    """计算两个文本的 Jaccard 相似度 (基于词集合)"""
+    return _jaccard(_token_set(text1), _token_set(text2))
+
+
 def deduplicate_articles(articles: List[Dict], threshold: float = 0.6) -> List[Dict]:
     """对文章列表进行去重。threshold: 相似度阈值 (0.0-1.0)，高于此值视为重复。"""
     unique_articles: List[Dict] = []
+    unique_tokens: List[Set[str]] = []
     print(f"🔄 开始去重，原始数量: {len(articles)}")
     for article in articles:
         is_duplicate = False
-        current_content = article["title"] + " " + article["content_text"][:500]
-
-        for existing in unique_articles:
-            existing_content = existing["title"] + " " + existing["content_text"][:500]
-            similarity = calculate_jaccard_similarity(current_content, existing_content)
+        tokens = _token_set(article["title"] + " " + article["content_text"][:500])
+
+        for existing, existing_tokens in zip(unique_articles, unique_tokens):
+            # Jaccard <= 小集合/大集合，集合大小悬殊时无需求交集
+            small, large = sorted((len(tokens), len(existing_tokens)))
+            if small <= threshold * large:
+                continue
+            similarity = _jaccard(tokens, existing_tokens)
             if similarity > threshold:
                 is_duplicate = True
                 print(
@@ -105,6 +212,7 @@ def deduplicate_articles(articles: List[Dict], threshold: float = 0.6) -> List[D
 
         if not is_duplicate:
             unique_articles.append(article)
+            unique_tokens.append(tokens)
 
     print(f"✅ 去重完成，剩余数量: {len(unique_articles)}")
     return unique_articles
@@ -112,28 +220,37 @@ def deduplicate_articles(articles: List[Dict], threshold: float = 0.6) -> List[D
 
 # === 核心三步工作流 ===
 
-def step1_filter_articles(articles: List[Dict], prompt_template: str, client: OpenAI, model: str) -> List[Dict]:
+def step1_filter_articles(
+    articles: List[Dict],
+    prompt_template: str,
+    client: OpenAI,
+    model: str,
+    budget: Optional[RunBudget] = None,
+    schema: Optional[Dict] = None,
+    stats: Optional[ParseStats] = None,
+) -> List[Dict]:
     """步骤1：快速初筛 (Pass/Fail) — 兼容 {"pass": true/false} 或 {"value": number}"""
     filtered_articles: List[Dict] = []
 
-    for article in articles:
+    for idx, article in enumerate(articles):
+        reason = budget.exhausted(share=budget.step1_share) if budget else None
+        if reason:
+            budget.stop("step1", reason, len(articles) - idx)
+            break
         prompt = prompt_template.format(title=article["title"], content=article["content_text"][:1000])
-        try:
-            resp = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-            )
-        except Exception as e:
-            print(f"Filter call error: {e}")
+        res = _chat_structured(
+            client,
+            model,
+            prompt,
+            schema or DEFAULT_SCHEMAS["step1"],
+            "step1",
+            temperature=0.1,
+            budget=budget,
+            stats=stats,
+        )
+        if res is None:
             continue
 
-        try:
-            res = safe_json_parse(resp.choices[0].message.content)  # type: ignore[attr-defined]
-        except Exception:
-            res = {}
-
         should_ignore = bool(res.get("ignore", False))
         pass_flag: Optional[bool] = None
         if "pass" in res:
@@ -156,12 +273,16 @@ def step1_filter_articles(articles: List[Dict], prompt_template: str, client: Op
             article["filter_data"] = res
             filtered_articles.append(article)
         else:
+            if res:
+                # 明确的不通过结论；解析失败被丢弃的（{}）不记录，下次更新时重新候选
+                article["filter_data"] = res
             print(f"过滤掉: {article['title']} (Reason: {res.get('reason')})")
 
     return filtered_articles
 
 
-def _chat_json(client: OpenAI, model: str, prompt: str, temperature: float = 0.3) -> Dict:
+def _chat_raw(client: OpenAI, model: str, prompt: str, temperature: float = 0.3, budget: Optional[RunBudget] = None) -> Optional[str]:
+    """JSON 模式调用，返回原始文本；调用失败返回 None"""
     try:
         resp = client.chat.completions.create(
             model=model,
@@ -169,31 +290,136 @@ def _chat_json(client: OpenAI, model: str, prompt: str, temperature: float = 0.3
             response_format={"type": "json_object"},
             temperature=temperature,
         )
-        return safe_json_parse(resp.choices[0].message.content)  # type: ignore[attr-defined]
+        if budget:
+            budget.charge(resp)
+        return resp.choices[0].message.content  # type: ignore[attr-defined]
     except Exception as e:
         print(f"Chat json error: {e}")
+        return None
+
+
+def _chat_structured(
+    client: OpenAI,
+    model: str,
+    prompt: str,
+    schema: Dict,
+    step: str,
+    temperature: float = 0.3,
+    budget: Optional[RunBudget] = None,
+    stats: Optional[ParseStats] = None,
+) -> Optional[Dict]:
+    """按 schema 获取结构化结果：容错解析 + 类型转换，最多追加一次请求。
+    完全无法解析时重新请求完整结果；部分字段缺失/错误时只补充这些字段。
+    调用失败返回 None；补充后仍缺少必需字段时返回 {}。"""
+    stats = stats or ParseStats()
+    text = _chat_raw(client, model, prompt, temperature, budget)
+    if text is None:
+        return None
+    stats.add(step, "calls")
+    data, status = parse_json_lenient(text)
+    stats.add(step, status)
+
+    if status == "failed" and not (budget and budget.exhausted()):
+        # 没有任何可用字段，只补 required 会丢掉标题/分类/标签等可选字段
+        stats.add(step, "full_retries")
+        data, status = parse_json_lenient(_chat_raw(client, model, prompt, temperature, budget))
+        if status != "failed":
+            stats.add(step, "full_recovered")
+        data, _ = coerce_to_schema(data, schema)
+    else:
+        data, invalid = coerce_to_schema(data, schema)
+        if invalid and not (budget and budget.exhausted()):
+            stats.add(step, "field_retries")
+            retry_text = _chat_raw(client, model, field_repair_prompt(prompt, data, invalid, schema), temperature, budget)
+            patch, _ = parse_json_lenient(retry_text)
+            patch, _ = coerce_to_schema({k: v for k, v in patch.items() if k in invalid}, schema)
+            if patch:
+                stats.add(step, "field_recovered")
+            data, _ = coerce_to_schema({**data, **patch}, schema)
+
+    if not is_complete(data, schema):
+        stats.add(step, "dropped")
         return {}
+    return data
 
 
-def step2_deep_analyze(articles: List[Dict], prompt_template: str, client: OpenAI, model: str) -> List[Dict]:
-    """步骤2：深度分析 (摘要、打分、标签)"""
+def _score(article: Dict, key: str = "ai_analysis") -> float:
+    try:
+        return float(article.get(key, {}).get("score", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _filter_priority(article: Dict) -> float:
+    """步骤1 给出的数值信号（value/score），用于步骤2 的处理顺序；缺失时为 0"""
+    data = article.get("filter_data", {})
+    for key in ("value", "score"):
+        try:
+            return float(data[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return 0.0
+
+
+def step2_deep_analyze(
+    articles: List[Dict],
+    prompt_template: str,
+    client: OpenAI,
+    model: str,
+    budget: Optional[RunBudget] = None,
+    enough_count: int = 0,
+    enough_score: float = 70,
+    schema: Optional[Dict] = None,
+    stats: Optional[ParseStats] = None,
+) -> List[Dict]:
+    """步骤2：深度分析 (摘要、打分、标签)。
+    按步骤1 信号从高到低处理；enough_count > 0 时，已有 enough_count 篇评分 >= enough_score 即提前结束。"""
     analyzed: List[Dict] = []
-    for article in articles:
+    high_count = 0
+    ordered = sorted(articles, key=_filter_priority, reverse=True)
+    for idx, article in enumerate(ordered):
+        reason = budget.exhausted() if budget else None
+        if not reason and enough_count and high_count >= enough_count:
+            reason = "enough_high_score"
+        if reason:
+            if budget:
+                budget.stop("step2", reason, len(ordered) - idx)
+            break
         prompt = prompt_template.format(title=article["title"], content=article["content_text"][:4000])
-        ai_data = _chat_json(client, model, prompt, temperature=0.3)
+        ai_data = _chat_structured(
+            client,
+            model,
+            prompt,
+            schema or DEFAULT_SCHEMAS["step2"],
+            "step2",
+            temperature=0.3,
+            budget=budget,
+            stats=stats,
+        )
         if ai_data:
             article["ai_analysis"] = ai_data
             analyzed.append(article)
+            if _score(article) >= enough_score:
+                high_count += 1
     return analyzed
 
 
-def step3_global_summary(analyzed_articles: List[Dict], prompt_template: str, client: OpenAI, model: str) -> str:
+def fallback_summary(articles: List[Dict]) -> str:
+    """无法调用 LLM 时的简报：列出高分文章的一句话看点"""
+    lines = ["（预算已用尽，以下为按评分排列的本期要点）", ""]
+    for item in articles[:10]:
+        ai = item.get("ai_analysis", {})
+        lines.append(f"- **{ai.get('title_cn') or item.get('title')}**：{ai.get('one_sentence', '')}")
+    return "\n".join(lines)
+
+
+def step3_global_summary(analyzed_articles: List[Dict], prompt_template: str, client: OpenAI, model: str, budget: Optional[RunBudget] = None) -> str:
     """步骤3：全局总结"""
     if not analyzed_articles:
         return "本期无内容。"
 
-    high_value_articles = [a for a in analyzed_articles if a.get("ai_analysis", {}).get("score", 0) >= 6]
-    high_value_articles.sort(key=lambda x: x.get("ai_analysis", {}).get("score", 0), reverse=True)
+    high_value_articles = [a for a in analyzed_articles if _score(a) >= 6]
+    high_value_articles.sort(key=_score, reverse=True)
 
     if not high_value_articles:
         high_value_articles = analyzed_articles[:10]
@@ -213,6 +439,9 @@ def step3_global_summary(analyzed_articles: List[Dict], prompt_template: str, cl
         摘要: {ai.get('summary', '')}
         """
 
+    if budget and budget.exhausted(reserve=False):
+        return fallback_summary(high_value_articles)
+
     prompt = prompt_template.format(context=context_str)
     try:
         resp = client.chat.completions.create(
@@ -220,36 +449,129 @@ def step3_global_summary(analyzed_articles: List[Dict], prompt_template: str, cl
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
         )
+        if budget:
+            budget.charge(resp)
         return resp.choices[0].message.content  # type: ignore[attr-defined]
     except Exception as e:
         return f"总结失败: {e}"
 
 
-def run_pipeline(domain_name: str, prompts: Dict[str, str], progress_callback: Optional[Callable[[float, str], None]] = None, cfg: Optional[Dict] = None) -> Dict:
-    """执行完整流程的入口函数"""
-    cfg = cfg or get_config()
-    client = get_llm_client(cfg)
+def count_by_source(*groups: List[Dict]) -> Dict[str, Dict[str, int]]:
+    """按订阅源统计各阶段文章数，groups 依次为 raw / judged / passed / analyzed，写入 meta 供历史分析计算通过率。
+    judged 为得到步骤1 结论的文章，作为通过率的分母：被去重或因预算/提前结束未初筛的文章不计入，
+    否则预算先截断的低排名源通过率被低估，下次排名更低。"""
+    names = ("raw", "judged", "passed", "analyzed")
+    counts: Dict[str, Dict[str, int]] = {}
+    for name, group in zip(names, groups):
+        for article in group:
+            bucket = counts.setdefault(article.get("source", "Unknown"), {n: 0 for n in names})
+            bucket[name] += 1
+    return counts
+
+
+def _dedup_and_analyze(
+    raw_articles: List[Dict],
+    prompts: Dict[str, str],
+    cfg: Dict,
+    client: OpenAI,
+    budget: RunBudget,
+    parse_stats: ParseStats,
+    progress_callback: Optional[Callable[[float, str], None]] = None,
+    known_articles: Optional[List[Dict]] = None,
+) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """去重 + 步骤1 + 步骤2，返回 (unique, passed, analyzed)。
+    known_articles 为已在报告中的文章：参与去重比较（排在前面以保留旧文章），但不会再次分析。"""
     model = cfg["LLM_MODEL"]
-
-    if progress_callback:
-        progress_callback(0.1, "正在从 FreshRSS 拉取数据...")
-    raw_articles = fetch_rss_articles(cfg)
+    known_articles = known_articles or []
+    known_ids = {id(a) for a in known_articles}
 
     if progress_callback:
         progress_callback(0.2, "正在进行内容去重...")
-    unique_articles = deduplicate_articles(raw_articles, threshold=float(cfg.get("DEDUP_THRESHOLD", 0.65)))
+    unique_articles = deduplicate_articles(known_articles + raw_articles, threshold=float(cfg.get("DEDUP_THRESHOLD", 0.65)))
+    if cfg.get("SEMANTIC_DEDUP"):
+        from services.semantic import semantic_deduplicate
+
+        if progress_callback:
+            progress_callback(0.25, "正在进行语义去重与聚类...")
+        unique_articles = semantic_deduplicate(unique_articles, cfg, client, budget=budget)
+    unique_articles = [a for a in unique_articles if id(a) not in known_ids]
 
     if progress_callback:
         progress_callback(0.3, f"去重后剩余 {len(unique_articles)} 篇，开始步骤1：智能初筛...")
-    passed_articles = step1_filter_articles(unique_articles, prompts["step1"], client, model)
+    passed_articles = step1_filter_articles(
+        unique_articles,
+        prompts["step1"],
+        client,
+        model,
+        budget=budget,
+        schema=get_schema(prompts, "step1"),
+        stats=parse_stats,
+    )
 
     if progress_callback:
         progress_callback(0.6, f"初筛通过 {len(passed_articles)} 篇，开始步骤2：深度分析...")
-    analyzed_articles = step2_deep_analyze(passed_articles, prompts["step2"], client, model)
+    analyzed_articles = step2_deep_analyze(
+        passed_articles,
+        prompts["step2"],
+        client,
+        model,
+        budget=budget,
+        enough_count=int(cfg.get("EARLY_STOP_TOP_N", 0)),
+        enough_score=float(cfg.get("EARLY_STOP_MIN_SCORE", 70)),
+        schema=get_schema(prompts, "step2"),
+        stats=parse_stats,
+    )
+    return unique_articles, passed_articles, analyzed_articles
+
+
+def _step1_judged(articles: List[Dict]) -> List[Dict]:
+    """得到步骤1 结论（通过或明确不通过）的文章"""
+    return [a for a in articles if a.get("filter_data")]
+
+
+def _judged_articles(unique: List[Dict], passed: List[Dict], analyzed: List[Dict]) -> List[Dict]:
+    """得到明确结论的文章：步骤1 判定不通过，或步骤2 完成分析。
+    预算用尽、提前结束或调用失败而未处理完的文章不计入，“更新本期”时会重新候选。"""
+    passed_ids = {id(a) for a in passed}
+    analyzed_ids = {id(a) for a in analyzed}
+    return [
+        a for a in unique
+        if id(a) in analyzed_ids or (id(a) not in passed_ids and a.get("filter_data"))
+    ]
+
+
+def _seen_links(articles: List[Dict]) -> List[str]:
+    """已处理过的链接（含语义聚类挂载的相关链接），供“更新本期”模式跳过"""
+    links: List[str] = []
+    for article in articles:
+        links.append(article.get("link", ""))
+        links.extend(r.get("link", "") for r in article.get("related", []))
+    return [link for link in links if link]
+
+
+def _top_links(articles: List[Dict], top_n: int) -> Set[str]:
+    return {a.get("link", "") for a in sorted(articles, key=_score, reverse=True)[:top_n]}
+
+
+def run_pipeline(domain_name: str, prompts: Dict[str, str], progress_callback: Optional[Callable[[float, str], None]] = None, cfg: Optional[Dict] = None) -> Dict:
+    """执行完整流程的入口函数"""
+    cfg = cfg or get_config()
+    client = get_llm_client(cfg)
+    model = cfg["LLM_MODEL"]
+    budget = RunBudget.from_cfg(cfg)
+    parse_stats = ParseStats()
+
+    if progress_callback:
+        progress_callback(0.1, "正在从 FreshRSS 拉取数据...")
+    raw_articles = fetch_rss_articles(cfg, domain=domain_name)
+
+    unique_articles, passed_articles, analyzed_articles = _dedup_and_analyze(
+        raw_articles, prompts, cfg, client, budget, parse_stats, progress_callback
+    )
 
     if progress_callback:
         progress_callback(0.9, "步骤3：生成本期简报...")
-    final_summary = step3_global_summary(analyzed_articles, prompts["step3"], client, model)
+    final_summary = step3_global_summary(analyzed_articles, prompts["step3"], client, model, budget=budget)
 
     report_data = {
         "meta": {
@@ -259,9 +581,83 @@ def run_pipeline(domain_name: str, prompts: Dict[str, str], progress_callback: O
             "total_raw": len(raw_articles),
             "total_unique": len(unique_articles),
             "total_passed": len(passed_articles),
+            "source_counts": count_by_source(
+                raw_articles, _step1_judged(unique_articles), passed_articles, analyzed_articles
+            ),
+            "seen_links": _seen_links(_judged_articles(unique_articles, passed_articles, analyzed_articles)),
+            "budget": budget.to_meta(),
+            "parse_stats": parse_stats.to_meta(),
         },
         "global_summary": final_summary,
         "articles": analyzed_articles,
     }
 
     return report_data
+
+
+def update_pipeline(
+    base_report: Dict,
+    prompts: Dict[str, str],
+    progress_callback: Optional[Callable[[float, str], None]] = None,
+    cfg: Optional[Dict] = None,
+) -> Dict:
+    """更新本期：只分析 base_report 中未出现过的文章，按评分合并；
+    仅当前 STEP3_TOP_N 篇的集合发生变化时才重新生成全局总结。返回更新后的报告（不修改 base_report）。"""
+    cfg = cfg or get_config()
+    client = get_llm_client(cfg)
+    model = cfg["LLM_MODEL"]
+    budget = RunBudget.from_cfg(cfg)
+    parse_stats = ParseStats()
+    meta = dict(base_report.get("meta", {}))
+    domain_name = meta.get("domain", "")
+    existing = copy.deepcopy(base_report.get("articles", []))
+
+    if progress_callback:
+        progress_callback(0.1, "正在从 FreshRSS 拉取新增文章...")
+    seen = set(meta.get("seen_links", [])) | set(_seen_links(existing))
+    raw_articles = fetch_rss_articles(cfg, domain=domain_name, skip_links=seen)
+    print(f"🆕 本期已有 {len(existing)} 篇，新增候选 {len(raw_articles)} 篇")
+
+    unique_articles, passed_articles, analyzed_articles = _dedup_and_analyze(
+        raw_articles, prompts, cfg, client, budget, parse_stats, progress_callback, known_articles=existing
+    )
+
+    merged = sorted(existing + analyzed_articles, key=_score, reverse=True)
+    top_n = int(cfg.get("STEP3_TOP_N", 10))
+    summary = base_report.get("global_summary", "")
+    regenerated = _top_links(merged, top_n) != _top_links(existing, top_n) or not summary
+    if regenerated:
+        if progress_callback:
+            progress_callback(0.9, "精选文章有变化，重新生成本期简报...")
+        summary = step3_global_summary(merged, prompts["step3"], client, model, budget=budget)
+
+    source_counts = {k: dict(v) for k, v in (meta.get("source_counts") or {}).items()}
+    new_counts = count_by_source(raw_articles, _step1_judged(unique_articles), passed_articles, analyzed_articles)
+    for source, counts in new_counts.items():
+        bucket = source_counts.setdefault(source, {"raw": 0, "judged": 0, "passed": 0, "analyzed": 0})
+        # 旧报告没有 judged，沿用 raw 作为已有部分的分母
+        bucket.setdefault("judged", bucket.get("raw", 0))
+        for key, value in counts.items():
+            bucket[key] = bucket.get(key, 0) + value
+
+    meta.update(
+        {
+            "updated": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "updates": int(meta.get("updates", 0)) + 1,
+            "total_raw": int(meta.get("total_raw", 0)) + len(raw_articles),
+            "total_unique": int(meta.get("total_unique", 0)) + len(unique_articles),
+            "total_passed": int(meta.get("total_passed", 0)) + len(passed_articles),
+            "source_counts": source_counts,
+            "seen_links": sorted(
+                seen | set(_seen_links(_judged_articles(unique_articles, passed_articles, analyzed_articles)))
+            ),
+            "last_update": {
+                "new_raw": len(raw_articles),
+                "new_analyzed": len(analyzed_articles),
+                "summary_regenerated": regenerated,
+                "budget": budget.to_meta(),
+                "parse_stats": parse_stats.to_meta(),
+            },
+        }
+    )
+    return {"meta": meta, "global_summary": summary, "articles": merged}
@@ -4,10 +4,10 @@ from datetime import datetime
 import streamlit as st
 
 import core
-from services.store import ensure_dirs, load_prompts, REPORTS_DIR
-from services.config import get_config, is_config_ready
+from services.store import ensure_dirs, latest_report_file, load_prompts, report_timestamp, REPORTS_DIR
+from services.config import get_config, is_config_ready, list_profiles
 from services.git_helper import commit
-from utils.reporting import aggregate_history_stats, generate_markdown_report
+from utils.reporting import aggregate_history_stats, generate_markdown_report, patch_markdown_report
 from utils.ui import metric_card, light_card
 
 ensure_dirs()
@@ -15,7 +15,12 @@ st.set_page_config(page_title="运行分析", page_icon="⚡️", layout="wide")
 
 st.title("⚡️ 开始新一期分析")
 
-cfg = get_config()
+# secrets 中定义了 [profiles.<name>] 时，可为不同团队选择各自的 FreshRSS 账号 / LLM 配置
+profiles = list_profiles()
+profile = None
+if profiles:
+    profile = st.selectbox("配置档案", [None] + profiles, format_func=lambda p: p or "默认")
+cfg = get_config(profile)
 if not is_config_ready(cfg):
     st.warning("检测到配置不完整，请先在‘提示词与配置’页面设置 st.secrets 或环境变量。")
 
@@ -23,7 +28,7 @@ colm = st.columns(4)
 try:
     raw_articles = core.fetch_rss_articles(cfg)
     unique_articles = core.deduplicate_articles(raw_articles, threshold=float(cfg.get("DEDUP_THRESHOLD", 0.65)))
-    hist_stats = aggregate_history_stats(limit=50)
+    hist_stats = aggregate_history_stats()
     prompts = load_prompts()
     
     metrics_data = {
@@ -49,6 +54,21 @@ with col1:
 with col2:
     run_btn = st.button("🚀 立即运行", type="primary", use_container_width=True)
 
+# 今日已有该领域的报告时，可只分析新增文章并合并进当期
+base_path = latest_report_file(selected_domain)
+base_report = None
+if base_path:
+    with open(base_path, "r", encoding="utf-8") as f:
+        base_report = json.load(f)
+    if not base_report.get("meta", {}).get("date", "").startswith(datetime.now().strftime("%Y-%m-%d")):
+        base_report = None
+update_mode = st.checkbox(
+    "🔄 更新今日简报（仅分析新增文章并合并）",
+    value=False,
+    disabled=base_report is None,
+    help="今日尚无该领域报告时不可用",
+)
+
 if run_btn:
     status_text = st.empty()
     progress_bar = st.progress(0)
@@ -58,22 +78,37 @@ if run_btn:
         status_text.text(text)
 
     try:
-        result = core.run_pipeline(
-            selected_domain,
-            prompts_data[selected_domain],
-            progress_callback=update_progress,
-            cfg=cfg,
-        )
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        json_name = f"{ts}_{selected_domain}.json"
-        json_path = os.path.join(REPORTS_DIR, json_name)
+        if update_mode and base_report is not None:
+            result = core.update_pipeline(
+                base_report,
+                prompts_data[selected_domain],
+                progress_callback=update_progress,
+                cfg=cfg,
+            )
+            json_path = base_path
+            json_name = os.path.basename(json_path)
+            ts = report_timestamp(json_name, selected_domain)
+        else:
+            result = core.run_pipeline(
+                selected_domain,
+                prompts_data[selected_domain],
+                progress_callback=update_progress,
+                cfg=cfg,
+            )
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            json_name = f"{ts}_{selected_domain}.json"
+            json_path = os.path.join(REPORTS_DIR, json_name)
         with open(json_path, "w", encoding="utf-8") as f:
             json.dump(result, f, ensure_ascii=False, indent=2)
 
-        # 生成并保存 Markdown
-        md_text = generate_markdown_report(result)
+        # 生成并保存 Markdown；更新模式下在已有 .md 上增量修改
         md_name = f"{ts}_{selected_domain}.md"
         md_path = os.path.join(REPORTS_DIR, md_name)
+        if update_mode and base_report is not None and os.path.exists(md_path):
+            with open(md_path, "r", encoding="utf-8") as f:
+                md_text = patch_markdown_report(f.read(), result, base_report)
+        else:
+            md_text = generate_markdown_report(result)
         with open(md_path, "w", encoding="utf-8") as f:
             f.write(md_text)
 
@@ -86,8 +121,10 @@ if run_btn:
         auto_commit = bool(cfg.get("GIT_AUTO_COMMIT", True))
         auto_tag = bool(cfg.get("GIT_AUTO_TAG", False))
         if auto_commit:
-            tag = f"report-{ts}" if auto_tag else None
-            summary = commit([json_path, md_path], message=f"feat(report): {selected_domain} {ts}", tag=tag, cwd=os.getcwd())
+            suffix = f"-u{result['meta']['updates']}" if result.get("meta", {}).get("updates") else ""
+            tag = f"report-{ts}{suffix}" if auto_tag else None
+            message = f"feat(report): {selected_domain} {ts}" + (f" (update {suffix[2:]})" if suffix else "")
+            summary = commit([json_path, md_path], message=message, tag=tag, cwd=os.getcwd(), cfg=cfg)
             light_card("Git 提交结果", summary)
 
         st.info("前往左侧页面 ‘历史报告’ 查看详情或导出 Markdown。")
@@ -95,22 +132,51 @@ if run_btn:
         st.error(f"运行出错: {e}")
 
 try:
-    hist = aggregate_history_stats(limit=50)
-    cat = hist.get("category_count", {})
-    per = hist.get("per_issue_passed", [])
     import altair as alt
-    import pandas as pd
+    from utils.analytics import (
+        category_trends,
+        issue_trend,
+        keyword_frequency,
+        load_history_frames,
+        score_distribution,
+        source_quality,
+    )
+
+    frames = load_history_frames()
+    articles_df = frames["articles"]
 
     left, right = st.columns(2)
     with left:
         st.subheader("📊 历史类别分布")
-        df_cat = pd.DataFrame({"category": list(cat.keys()), "count": list(cat.values())})
+        df_cat = articles_df["category"].value_counts().rename_axis("category").reset_index(name="count")
         chart_cat = alt.Chart(df_cat).mark_bar(color="#1479FF").encode(x="category", y="count")
         st.altair_chart(chart_cat, use_container_width=True)
     with right:
         st.subheader("📈 每期通过数趋势")
-        df_per = pd.DataFrame(per, columns=["date", "passed"]) if per else pd.DataFrame({"date": [], "passed": []})
-        chart_line = alt.Chart(df_per).mark_line(color="#1479FF").encode(x="date", y="passed")
+        df_per = issue_trend(frames["reports"])
+        chart_line = alt.Chart(df_per).mark_line(color="#1479FF").encode(x="issue_date:T", y="total_passed")
         st.altair_chart(chart_line, use_container_width=True)
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("🗂️ 类别趋势（按周）")
+        df_trend = category_trends(articles_df, freq="W")
+        chart_trend = alt.Chart(df_trend).mark_area().encode(x="period:T", y="count", color="category")
+        st.altair_chart(chart_trend, use_container_width=True)
+    with right:
+        st.subheader("🎯 评分分布")
+        df_score = score_distribution(articles_df)
+        chart_score = alt.Chart(df_score).mark_bar(color="#1479FF").encode(x=alt.X("bucket", sort=None), y="count")
+        st.altair_chart(chart_score, use_container_width=True)
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("🏷️ 高频关键词")
+        df_kw = keyword_frequency(articles_df, top=20)
+        chart_kw = alt.Chart(df_kw).mark_bar(color="#1479FF").encode(x="count", y=alt.Y("keyword", sort="-x"))
+        st.altair_chart(chart_kw, use_container_width=True)
+    with right:
+        st.subheader("📡 订阅源质量")
+        st.dataframe(source_quality(articles_df, frames["sources"]), use_container_width=True, hide_index=True)
 except Exception as e:
-    st.warning(f"历史统计绘制失败：{e}")
\ No newline at end of file
+    st.warning(f"历史统计绘制失败：{e}")
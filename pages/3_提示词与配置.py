@@ -3,7 +3,8 @@ import json
 import streamlit as st
 
 from services.store import ensure_dirs, load_prompts, save_prompts, PROMPTS_FILE
-from services.config import get_config, is_config_ready
+from services.clients import reset_clients
+from services.config import get_config, is_config_ready, list_profiles, reload_config, validate_config
 from services.git_helper import commit
 
 ensure_dirs()
@@ -19,9 +20,21 @@ if ready:
 else:
     st.warning("⚠️ 配置尚未完整。请在 .streamlit/secrets.toml 中设置 freshrss/llm/git 等字段，或通过环境变量提供。")
 
+for problem in validate_config(cfg):
+    st.warning(f"配置检查：{problem}")
+
+# 配置在进程内缓存，修改 secrets / 环境变量后需手动重新加载
+if st.button("🔄 重新加载配置"):
+    reload_config()
+    reset_clients()
+    st.rerun()
+
 with st.expander("📄 查看当前配置（敏感值不展示全量）", expanded=False):
     safe_cfg = {k: ("***" if "KEY" in k or "PASS" in k else v) for k, v in cfg.items()}
     st.json(safe_cfg)
+    for name in list_profiles():
+        st.markdown(f"**档案 `{name}`**")
+        st.json({k: ("***" if "KEY" in k or "PASS" in k else v) for k, v in get_config(name).items()})
 
 st.markdown("---")
 
@@ -79,7 +92,7 @@ if selected_domain:
         p3 = st.text_area("Step 3 Prompt", current_p.get("step3", ""), height=150)
 
         if st.form_submit_button("💾 保存配置"):
-            prompts_data[selected_domain] = {"step1": p1, "step2": p2, "step3": p3}
+            prompts_data[selected_domain] = {**current_p, "step1": p1, "step2": p2, "step3": p3}
             save_prompts(prompts_data)
             st.success("配置已更新！")
             cfg = get_config()
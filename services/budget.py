@@ -0,0 +1,87 @@
+from __future__ import annotations
+import time
+from typing import Any, Dict, Optional
+
+
+class RunBudget:
+    """单次运行的 LLM 预算：调用次数、token 数与耗时上限（0 表示不限制）。
+
+    步骤1/2 通过 exhausted() 判断是否继续，默认为步骤3 预留 reserve_calls 次调用与 reserve_tokens 个 token，
+    保证预算用尽时仍能基于已完成的文章生成简报。步骤1 最多使用步骤3 预留之外额度的 step1_share，
+    其余留给步骤2，避免预算全部花在初筛上而没有文章完成深度分析。"""
+
+    def __init__(
+        self,
+        max_calls: int = 0,
+        max_tokens: int = 0,
+        max_seconds: float = 0,
+        reserve_calls: int = 1,
+        reserve_tokens: int = 0,
+        step1_share: float = 0.5,
+    ):
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.reserve_calls = reserve_calls
+        self.reserve_tokens = reserve_tokens
+        self.step1_share = step1_share
+        self.calls = 0
+        self.tokens = 0
+        self.started = time.monotonic()
+        self.stop_reason: Optional[str] = None
+        self.stopped_at: Optional[str] = None
+        self.skipped: Dict[str, int] = {}
+
+    @classmethod
+    def from_cfg(cls, cfg: Dict[str, Any]) -> "RunBudget":
+        return cls(
+            max_calls=int(cfg.get("MAX_LLM_CALLS", 0) or 0),
+            max_tokens=int(cfg.get("MAX_TOKENS", 0) or 0),
+            max_seconds=float(cfg.get("MAX_RUNTIME_SECONDS", 0) or 0),
+            reserve_tokens=int(cfg.get("STEP3_RESERVE_TOKENS", 0) or 0),
+            step1_share=float(cfg.get("STEP1_BUDGET_SHARE", 0.5)),
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def charge(self, resp: Any) -> None:
+        """记录一次 LLM 调用及其 usage（响应不含 usage 时只计次数）"""
+        self.calls += 1
+        usage = getattr(resp, "usage", None)
+        total = getattr(usage, "total_tokens", None) if usage is not None else None
+        if total:
+            self.tokens += int(total)
+
+    def exhausted(self, reserve: bool = True, share: float = 1.0) -> Optional[str]:
+        """返回超出的预算项名称；未超出返回 None。reserve=False 时不计步骤3 的预留额度；
+        share < 1 时只允许使用（预留之外额度的）该比例，步骤1 传入 step1_share。"""
+        calls_left = self.reserve_calls if reserve else 0
+        tokens_left = self.reserve_tokens if reserve else 0
+        if self.max_calls and self.calls >= share * (self.max_calls - calls_left):
+            return "max_llm_calls"
+        if self.max_tokens and self.tokens >= share * (self.max_tokens - tokens_left):
+            return "max_tokens"
+        if reserve and self.max_seconds and self.elapsed >= share * self.max_seconds:
+            return "max_runtime"
+        return None
+
+    def stop(self, step: str, reason: str, skipped: int) -> None:
+        if self.stopped_at is None:
+            self.stopped_at, self.stop_reason = step, reason
+        self.skipped[step] = self.skipped.get(step, 0) + skipped
+        print(f"⏹️ {step} 提前结束 ({reason})，跳过 {skipped} 篇")
+
+    def to_meta(self) -> Dict[str, Any]:
+        return {
+            "max_llm_calls": self.max_calls,
+            "max_tokens": self.max_tokens,
+            "max_runtime_seconds": self.max_seconds,
+            "llm_calls": self.calls,
+            "tokens": self.tokens,
+            "elapsed_seconds": round(self.elapsed, 1),
+            "stopped_at": self.stopped_at,
+            "stop_reason": self.stop_reason,
+            "skipped": self.skipped,
+        }
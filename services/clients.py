@@ -0,0 +1,109 @@
+from __future__ import annotations
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import requests
+from freshrss_api import APIError, AuthenticationError, FreshRSSAPI
+from openai import OpenAI
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 10
+REQUEST_TIMEOUT = 60
+
+_LOCK = threading.Lock()
+_LLM_CLIENTS: Dict[Tuple[str, str], OpenAI] = {}
+_FRESHRSS_CLIENTS: Dict[Tuple[str, str, str], "PooledFreshRSSAPI"] = {}
+
+
+class PooledFreshRSSAPI(FreshRSSAPI):
+    """共享 requests.Session 的 FreshRSS 客户端，复用 keep-alive 连接与 TLS 会话。
+
+    原库每次请求都直接调用 requests.post；这里只替换发送方式，重试一次与鉴权判定保持一致。"""
+
+    def __init__(self, *args: Any, pool_size: int = POOL_SIZE, timeout: float = REQUEST_TIMEOUT, **kwargs: Any):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def _call(self, endpoint: str = "api", **params: Any) -> Dict[str, Any]:
+        query_params: Dict[str, Any] = {"api": ""}
+        if endpoint != "api":
+            query_params[endpoint] = ""
+        query_params.update(params)
+        if "as_" in query_params:
+            query_params["as"] = query_params.pop("as_")
+
+        retries = 1
+        while True:
+            try:
+                response = self.session.post(
+                    self.api_endpoint,
+                    params=query_params,
+                    data={"api_key": self.api_key},
+                    verify=self.verify_ssl,
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                result = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                if retries <= 0:
+                    raise APIError(f"API request failed after retry: {e}") from e
+                retries -= 1
+                time.sleep(2)
+                continue
+            if not result.get("auth"):
+                raise AuthenticationError("Invalid API credentials")
+            return result
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _fingerprint(secret: Any) -> str:
+    """注册表键中不保存明文凭据"""
+    return hashlib.sha256(str(secret).encode("utf-8")).hexdigest()[:16]
+
+
+def get_llm_client(cfg: Dict) -> OpenAI:
+    """按 (base_url, api_key) 复用进程内的 OpenAI 客户端（内部 httpx 连接池线程安全）"""
+    key = (cfg["LLM_BASE_URL"], _fingerprint(cfg["LLM_API_KEY"]))
+    with _LOCK:
+        client = _LLM_CLIENTS.get(key)
+        if client is None:
+            client = OpenAI(api_key=cfg["LLM_API_KEY"], base_url=cfg["LLM_BASE_URL"])  # type: ignore
+            _LLM_CLIENTS[key] = client
+    return client
+
+
+def get_freshrss_client(cfg: Dict) -> PooledFreshRSSAPI:
+    """按 (host, username, password) 复用 FreshRSS 客户端；只在首次创建时做一次鉴权请求"""
+    key = (cfg["FRESHRSS_HOST"], cfg["FRESHRSS_USER"], _fingerprint(cfg["FRESHRSS_PASS"]))
+    with _LOCK:
+        client = _FRESHRSS_CLIENTS.get(key)
+    if client is not None:
+        return client
+
+    # 鉴权是网络请求，放在锁外，避免一个账号的慢连接阻塞其他账号
+    created = PooledFreshRSSAPI(
+        host=cfg["FRESHRSS_HOST"],
+        username=cfg["FRESHRSS_USER"],
+        password=cfg["FRESHRSS_PASS"],
+    )
+    with _LOCK:
+        client = _FRESHRSS_CLIENTS.setdefault(key, created)
+    if client is not created:
+        created.close()
+    return client
+
+
+def reset_clients() -> None:
+    """清空客户端注册表（凭据变更或连接异常后调用）。
+    不主动关闭：其他会话的运行可能仍持有旧客户端，由其引用释放后被垃圾回收。"""
+    with _LOCK:
+        _LLM_CLIENTS.clear()
+        _FRESHRSS_CLIENTS.clear()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import os
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, List, Optional
 
 try:
     import streamlit as st 
@@ -15,11 +16,48 @@ except Exception:
         pass
 
 
-def _from_secrets() -> Dict[str, Any]:
-    if st is None:
+_CACHE: Dict[Optional[str], Dict[str, Any]] = {}
+_SECRETS: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.RLock()
+
+
+def _plain(value: Any) -> Any:
+    """st.secrets 的嵌套结构转为普通 dict，便于合并档案"""
+    if hasattr(value, "items"):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def _merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = _merge(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+def _load_secrets() -> Dict[str, Any]:
+    with _LOCK:
+        if "data" not in _SECRETS:
+            data: Dict[str, Any] = {}
+            if st is not None:
+                try:
+                    data = _plain(st.secrets)
+                except StreamlitSecretNotFoundError:
+                    pass
+                except Exception:
+                    # secrets 文件缺失或格式错误时降级为环境变量
+                    pass
+            _SECRETS["data"] = data
+        return _SECRETS["data"]
+
+
+def _from_secrets(sec: Dict[str, Any]) -> Dict[str, Any]:
+    if not sec:
         return {}
     try:
-        sec = st.secrets
         freshrss = sec.get("freshrss", {}) or {}
         llm = sec.get("llm", {}) or {}
         git = sec.get("git", {}) or {}
@@ -39,11 +77,27 @@ def _from_secrets() -> Dict[str, Any]:
             "FETCH_MAX_COUNT": int(sec.get("fetch_max_count", 100)),
             "DEDUP_THRESHOLD": float(sec.get("dedup_threshold", 0.65)),
             "CONCURRENCY": int(sec.get("concurrency", 1)),
+            "MAX_LLM_CALLS": int(sec.get("max_llm_calls", 0)),
+            "MAX_TOKENS": int(sec.get("max_tokens", 0)),
+            "MAX_RUNTIME_SECONDS": float(sec.get("max_runtime_seconds", 0)),
+            "STEP3_RESERVE_TOKENS": int(sec.get("step3_reserve_tokens", 8000)),
+            "STEP1_BUDGET_SHARE": float(sec.get("step1_budget_share", 0.5)),
+            "STEP3_TOP_N": int(sec.get("step3_top_n", 10)),
+            "EARLY_STOP_TOP_N": int(sec.get("early_stop_top_n", 0)),
+            "EARLY_STOP_MIN_SCORE": float(sec.get("early_stop_min_score", 70)),
+            "SOURCE_RANKING": bool(sec.get("source_ranking", True)),
+            "SOURCE_MAX_PER_FEED": int(sec.get("source_max_per_feed", 0)),
+            "SOURCE_PRIOR_WEIGHT": float(sec.get("source_prior_weight", 5.0)),
+            "SOURCE_HALF_LIFE_HOURS": float(sec.get("source_half_life_hours", 48)),
+            "SEMANTIC_DEDUP": bool(sec.get("semantic_dedup", False)),
+            "SEMANTIC_THRESHOLD": float(sec.get("semantic_threshold", 0.88)),
+            "EMBEDDING_MODEL": llm.get("embedding_model"),
+            "EMBEDDING_BATCH_SIZE": int(sec.get("embedding_batch_size", 32)),
+            "EMBEDDING_CACHE_SIZE": int(sec.get("embedding_cache_size", 5000)),
         }
         return cfg
-    except StreamlitSecretNotFoundError:
-        return {}
-    except Exception:
+    except (TypeError, ValueError) as e:
+        print(f"⚠️ secrets 配置解析失败，已忽略: {e}")
         return {}
 
 
@@ -63,15 +117,88 @@ def _from_env() -> Dict[str, Any]:
         "FETCH_MAX_COUNT": int(os.getenv("FETCH_MAX_COUNT", "100")),
         "DEDUP_THRESHOLD": float(os.getenv("DEDUP_THRESHOLD", "0.65")),
         "CONCURRENCY": int(os.getenv("CONCURRENCY", "1")),
+        "MAX_LLM_CALLS": int(os.getenv("MAX_LLM_CALLS", "0")),
+        "MAX_TOKENS": int(os.getenv("MAX_TOKENS", "0")),
+        "MAX_RUNTIME_SECONDS": float(os.getenv("MAX_RUNTIME_SECONDS", "0")),
+        "STEP3_RESERVE_TOKENS": int(os.getenv("STEP3_RESERVE_TOKENS", "8000")),
+        "STEP1_BUDGET_SHARE": float(os.getenv("STEP1_BUDGET_SHARE", "0.5")),
+        "STEP3_TOP_N": int(os.getenv("STEP3_TOP_N", "10")),
+        "EARLY_STOP_TOP_N": int(os.getenv("EARLY_STOP_TOP_N", "0")),
+        "EARLY_STOP_MIN_SCORE": float(os.getenv("EARLY_STOP_MIN_SCORE", "70")),
+        "SOURCE_RANKING": os.getenv("SOURCE_RANKING", "true").lower() == "true",
+        "SOURCE_MAX_PER_FEED": int(os.getenv("SOURCE_MAX_PER_FEED", "0")),
+        "SOURCE_PRIOR_WEIGHT": float(os.getenv("SOURCE_PRIOR_WEIGHT", "5")),
+        "SOURCE_HALF_LIFE_HOURS": float(os.getenv("SOURCE_HALF_LIFE_HOURS", "48")),
+        "SEMANTIC_DEDUP": os.getenv("SEMANTIC_DEDUP", "false").lower() == "true",
+        "SEMANTIC_THRESHOLD": float(os.getenv("SEMANTIC_THRESHOLD", "0.88")),
+        "EMBEDDING_MODEL": os.getenv("EMBEDDING_MODEL"),
+        "EMBEDDING_BATCH_SIZE": int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+        "EMBEDDING_CACHE_SIZE": int(os.getenv("EMBEDDING_CACHE_SIZE", "5000")),
     }
 
 
-def get_config() -> Dict[str, Any]:
-    """聚合 st.secrets 与环境变量，secrets 优先。"""
-    cfg = {**_from_env(), **_from_secrets()}
+def list_profiles() -> List[str]:
+    """secrets 中定义的配置档案名称（[profiles.<name>]）"""
+    return sorted(_load_secrets().get("profiles", {}) or {})
+
+
+def validate_config(cfg: Dict[str, Any]) -> List[str]:
+    """检查取值范围与格式，返回问题列表（为空表示通过）"""
+    problems: List[str] = []
+    for key in ("FRESHRSS_HOST", "LLM_BASE_URL"):
+        value = cfg.get(key)
+        if value and not str(value).startswith(("http://", "https://")):
+            problems.append(f"{key} 应以 http:// 或 https:// 开头")
+    for key in ("DEDUP_THRESHOLD", "SEMANTIC_THRESHOLD", "STEP1_BUDGET_SHARE"):
+        value = cfg.get(key)
+        if value is not None and not 0 <= value <= 1:
+            problems.append(f"{key} 应在 0~1 之间")
+    for key in ("FETCH_DAYS", "FETCH_MAX_COUNT", "CONCURRENCY", "EMBEDDING_BATCH_SIZE", "EMBEDDING_CACHE_SIZE"):
+        value = cfg.get(key)
+        if value is not None and value < 1:
+            problems.append(f"{key} 应为正整数")
+    for key in (
+        "MAX_LLM_CALLS", "MAX_TOKENS", "MAX_RUNTIME_SECONDS", "STEP3_RESERVE_TOKENS",
+        "STEP3_TOP_N", "EARLY_STOP_TOP_N", "SOURCE_MAX_PER_FEED", "SOURCE_PRIOR_WEIGHT",
+        "SOURCE_HALF_LIFE_HOURS",
+    ):
+        value = cfg.get(key)
+        if value is not None and value < 0:
+            problems.append(f"{key} 不能为负数")
+    return problems
+
+
+def _build_config(profile: Optional[str]) -> Dict[str, Any]:
+    sec = _load_secrets()
+    if profile:
+        overlay = (sec.get("profiles", {}) or {}).get(profile)
+        if overlay is None:
+            raise ValueError(f"未找到配置档案: {profile}")
+        sec = _merge(sec, overlay)
+    cfg = {**_from_env(), **_from_secrets(sec), "PROFILE": profile}
+    for problem in validate_config(cfg):
+        print(f"⚠️ 配置检查{f'（{profile}）' if profile else ''}: {problem}")
     return cfg
 
 
+def get_config(profile: Optional[str] = None) -> Dict[str, Any]:
+    """聚合 st.secrets 与环境变量，secrets 优先。
+
+    结果按档案缓存在进程内，返回副本；profile 对应 secrets 中的 [profiles.<name>]，
+    其字段覆盖顶层同名配置。修改 secrets 或环境变量后调用 reload_config() 生效。"""
+    with _LOCK:
+        if profile not in _CACHE:
+            _CACHE[profile] = _build_config(profile)
+        return dict(_CACHE[profile])
+
+
+def reload_config() -> None:
+    """清空配置缓存，下次 get_config() 重新读取 secrets 与环境变量"""
+    with _LOCK:
+        _CACHE.clear()
+        _SECRETS.clear()
+
+
 def is_config_ready(cfg: Dict[str, Any]) -> bool:
     keys = [
         "FRESHRSS_HOST", "FRESHRSS_USER", "FRESHRSS_PASS",
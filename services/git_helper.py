@@ -1,7 +1,7 @@
 from __future__ import annotations
 import os
 import subprocess
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from services.config import get_config
 
@@ -10,25 +10,50 @@ def _run(cmd: List[str], cwd: Optional[str] = None) -> subprocess.CompletedProce
     return subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
 
 
-def ensure_repo(cwd: Optional[str] = None) -> None:
+def _identity_args(cfg: Dict[str, Any]) -> List[str]:
+    """以 -c 传入提交者身份：多个配置档案并发提交时不依赖仓库级 git config"""
+    args: List[str] = []
+    if cfg.get("GIT_USER_NAME"):
+        args += ["-c", f"user.name={cfg['GIT_USER_NAME']}"]
+    if cfg.get("GIT_USER_EMAIL"):
+        args += ["-c", f"user.email={cfg['GIT_USER_EMAIL']}"]
+    return args
+
+
+def _config_value(key: str, cwd: str) -> str:
+    return _run(["git", "config", "--get", key], cwd=cwd).stdout.strip()
+
+
+def ensure_repo(cwd: Optional[str] = None, cfg: Optional[Dict[str, Any]] = None) -> None:
+    """初始化仓库；仅在仓库尚未配置提交者身份时写入默认值。
+    各配置档案的身份由 commit() 以 -c 传入，不修改仓库级 git config。"""
     cwd = cwd or os.getcwd()
     if not os.path.isdir(os.path.join(cwd, ".git")):
         _run(["git", "init"], cwd=cwd)
-    cfg = get_config()
-    if cfg.get("GIT_USER_NAME"):
+    cfg = cfg or get_config()
+    if cfg.get("GIT_USER_NAME") and not _config_value("user.name", cwd):
         _run(["git", "config", "user.name", cfg["GIT_USER_NAME"]], cwd=cwd)
-    if cfg.get("GIT_USER_EMAIL"):
+    if cfg.get("GIT_USER_EMAIL") and not _config_value("user.email", cwd):
         _run(["git", "config", "user.email", cfg["GIT_USER_EMAIL"]], cwd=cwd)
 
 
-def commit(paths: List[str], message: str, tag: Optional[str] = None, cwd: Optional[str] = None) -> str:
-    """Add+commit+optional tag. Returns short log or error."""
+def commit(
+    paths: List[str],
+    message: str,
+    tag: Optional[str] = None,
+    cwd: Optional[str] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Add+commit+optional tag. Returns short log or error.
+    cfg 为当前配置档案（其 git 子表决定提交者身份），缺省时使用默认配置。"""
     cwd = cwd or os.getcwd()
-    ensure_repo(cwd)
+    cfg = cfg or get_config()
+    ensure_repo(cwd, cfg)
+    identity = _identity_args(cfg)
     add = _run(["git", "add", "--" ] + paths, cwd=cwd)
     if add.returncode != 0:
         return f"git add error: {add.stderr.strip()}"
-    commit_res = _run(["git", "commit", "-m", message], cwd=cwd)
+    commit_res = _run(["git", *identity, "commit", "-m", message], cwd=cwd)
     if commit_res.returncode != 0:
         if "nothing to commit" in commit_res.stderr.lower() or "nothing to commit" in commit_res.stdout.lower():
             summary = "nothing to commit"
@@ -37,7 +62,7 @@ def commit(paths: List[str], message: str, tag: Optional[str] = None, cwd: Optio
     else:
         summary = commit_res.stdout.strip()
     if tag:
-        tag_res = _run(["git", "tag", "-a", tag, "-m", message], cwd=cwd)
+        tag_res = _run(["git", *identity, "tag", "-a", tag, "-m", message], cwd=cwd)
         if tag_res.returncode != 0:
             summary += f"; tag error: {tag_res.stderr.strip()}"
     return summary
@@ -0,0 +1,188 @@
+from __future__ import annotations
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.store import CACHE_DIR
+
+LOCAL_MODEL = "local-hash"
+LOCAL_DIM = 512
+CACHE_MAX_ENTRIES = 5000
+_TOKEN_RE = re.compile(r"[\u4e00-\u9fff]|[a-z0-9]+")
+
+
+def article_text(article: Dict, max_chars: int = 1000) -> str:
+    return article["title"] + "\n" + article["content_text"][:max_chars]
+
+
+def local_embed(texts: List[str], dim: int = LOCAL_DIM) -> np.ndarray:
+    """离线嵌入：字/词 1-2 gram 特征哈希到固定维度。中文按单字切分，无需模型与网络，也用作测试桩。"""
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = _TOKEN_RE.findall(text.lower())
+        grams = tokens + [a + b for a, b in zip(tokens, tokens[1:])]
+        for gram in grams:
+            h = int.from_bytes(hashlib.md5(gram.encode("utf-8")).digest()[:4], "little")
+            out[row, h % dim] += 1.0 if h & 0x80000000 else -1.0
+    return _normalize(out)
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return mat / np.where(norms == 0, 1.0, norms)
+
+
+class EmbeddingCache:
+    """按 (模型, 文本) 哈希缓存向量，存为 data/cache/embeddings_<model>.npz。
+    只保留最近写入的 max_entries 条，文件大小与每次加载的开销不随运行次数增长。"""
+
+    def __init__(self, model: str, max_entries: int = CACHE_MAX_ENTRIES):
+        safe = re.sub(r"[^\w.-]+", "_", model)
+        self.path = os.path.join(CACHE_DIR, f"embeddings_{safe}.npz")
+        self.max_entries = max_entries
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            try:
+                data = np.load(self.path)
+                self._vectors = dict(zip(data["keys"].tolist(), data["vectors"]))
+            except Exception as e:
+                print(f"嵌入缓存读取失败，将重建: {e}")
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self._vectors.get(key)
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        # 先删除再写入，使重复写入的条目移到末尾（按写入先后淘汰）
+        self._vectors.pop(key, None)
+        self._vectors[key] = vector
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def save(self) -> None:
+        if not self._dirty or not self._vectors:
+            return
+        if self.max_entries and len(self._vectors) > self.max_entries:
+            keep = list(self._vectors.items())[-self.max_entries :]
+            self._vectors = dict(keep)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        keys = np.array(list(self._vectors.keys()))
+        vectors = np.stack(list(self._vectors.values())).astype(np.float32)
+        np.savez(self.path, keys=keys, vectors=vectors)
+        self._dirty = False
+
+
+def embed_texts(
+    texts: List[str],
+    client,
+    model: Optional[str],
+    batch_size: int = 32,
+    budget=None,
+    cache_size: int = CACHE_MAX_ENTRIES,
+) -> np.ndarray:
+    """批量计算嵌入。model 为空时使用本地哈希嵌入（重新计算比读写缓存更快，不缓存）；
+    远端嵌入按批计入 budget（RunBudget）并写入缓存。远端调用失败或预算用尽时整体降级到本地，
+    已付费获得的批次仍会保存，下次直接命中缓存。"""
+    model = model or LOCAL_MODEL
+    if model == LOCAL_MODEL:
+        return local_embed(texts)
+
+    cache = EmbeddingCache(model, max_entries=cache_size)
+    keys = [EmbeddingCache.key(t) for t in texts]
+    missing = [i for i, k in enumerate(keys) if cache.get(k) is None]
+
+    for start in range(0, len(missing), max(1, batch_size)):
+        batch = missing[start : start + batch_size]
+        reason = budget.exhausted() if budget else None
+        if reason:
+            print(f"嵌入调用超出预算 ({reason})，改用本地嵌入")
+            cache.save()
+            return local_embed(texts)
+        try:
+            resp = client.embeddings.create(model=model, input=[texts[i] for i in batch])
+            if budget:
+                budget.charge(resp)
+            data = sorted(resp.data, key=lambda d: d.index)
+            vectors = _normalize(np.array([d.embedding for d in data], dtype=np.float32))
+        except Exception as e:
+            print(f"Embedding call error: {e}，改用本地嵌入")
+            cache.save()
+            return local_embed(texts)
+        for i, vec in zip(batch, vectors):
+            cache.put(keys[i], vec)
+
+    # 先取结果再保存：本次文本数超过缓存上限时，淘汰不影响本次返回
+    result = np.stack([cache.get(k) for k in keys]) if texts else np.zeros((0, LOCAL_DIM), dtype=np.float32)
+    cache.save()
+    return result
+
+
+class VectorIndex:
+    """归一化向量的内积索引（NumPy 暴力检索），容量不足时倍增扩容"""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self._mat = np.zeros((capacity, dim), dtype=np.float32)
+        self.size = 0
+
+    def add(self, vector: np.ndarray) -> int:
+        if self.size == len(self._mat):
+            self._mat = np.vstack([self._mat, np.zeros_like(self._mat)])
+        self._mat[self.size] = vector
+        self.size += 1
+        return self.size - 1
+
+    def nearest(self, vector: np.ndarray):
+        """返回 (位置, 余弦相似度)；索引为空时返回 (-1, 0.0)"""
+        if self.size == 0:
+            return -1, 0.0
+        sims = self._mat[: self.size] @ vector
+        idx = int(np.argmax(sims))
+        return idx, float(sims[idx])
+
+
+def cluster_articles(articles: List[Dict], vectors: np.ndarray, threshold: float = 0.88) -> List[Dict]:
+    """贪心聚类：按输入顺序，与已有簇代表的相似度超过阈值即并入该簇。
+    返回各簇代表文章，其余成员以 {title, link, source} 形式挂在代表的 related 字段。"""
+    if not articles:
+        return []
+    index = VectorIndex(vectors.shape[1], capacity=min(len(articles), 1024))
+    representatives: List[Dict] = []
+    for article, vec in zip(articles, vectors):
+        pos, sim = index.nearest(vec)
+        if pos >= 0 and sim >= threshold:
+            rep = representatives[pos]
+            print(f"   🔗 语义重复 (相似度 {sim:.2f}): {article['title']} ==> {rep['title']}")
+            # 生成新列表而不是原地追加，避免改动调用方仍持有的旧报告数据
+            rep["related"] = rep.get("related", []) + [
+                {"title": article["title"], "link": article["link"], "source": article.get("source", "Unknown")}
+            ]
+            continue
+        index.add(vec)
+        representatives.append(article)
+    return representatives
+
+
+def semantic_deduplicate(articles: List[Dict], cfg: Dict, client, budget=None) -> List[Dict]:
+    """语义去重入口：嵌入 → 聚类，每个簇仅保留一篇进入后续分析；远端嵌入调用计入 budget"""
+    print(f"🧠 开始语义去重，输入数量: {len(articles)}")
+    texts = [article_text(a) for a in articles]
+    vectors = embed_texts(
+        texts,
+        client,
+        cfg.get("EMBEDDING_MODEL"),
+        batch_size=int(cfg.get("EMBEDDING_BATCH_SIZE", 32)),
+        budget=budget,
+        cache_size=int(cfg.get("EMBEDDING_CACHE_SIZE", CACHE_MAX_ENTRIES)),
+    )
+    clustered = cluster_articles(articles, vectors, threshold=float(cfg.get("SEMANTIC_THRESHOLD", 0.88)))
+    print(f"✅ 语义去重完成，簇数量: {len(clustered)}")
+    return clustered
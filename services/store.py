@@ -1,15 +1,18 @@
 import os
 import json
-from typing import Dict, List
+import re
+from typing import Dict, List, Optional
 
 DATA_DIR = "data"
 PROMPTS_FILE = os.path.join(DATA_DIR, "prompts.json")
 REPORTS_DIR = os.path.join(DATA_DIR, "reports")
 MARKDOWN_DIR = REPORTS_DIR  # 保存 md 与 json 同目录
+CACHE_DIR = os.path.join(DATA_DIR, "cache")  # 派生数据缓存，可随时删除重建
 
 
 def ensure_dirs() -> None:
     os.makedirs(REPORTS_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
     if not os.path.exists(PROMPTS_FILE):
         default_prompts = {
             "Bioinfo": {
@@ -40,3 +43,18 @@ def list_report_files(ext: str = ".json") -> List[str]:
                 files.append(os.path.join(REPORTS_DIR, name))
     files.sort(key=lambda p: os.path.getmtime(p), reverse=True)
     return files
+
+
+def report_timestamp(filename: str, domain: str) -> Optional[str]:
+    """从 {时间戳}_{领域}.json/.md 中取出时间戳（YYYYmmdd_HHMMSS）；不属于该领域时返回 None。
+    按完整模式匹配，领域名本身含下划线（如 AI_dev）时也不会与其他领域混淆。"""
+    match = re.fullmatch(r"(\d{8}_\d{6})_" + re.escape(domain) + r"\.(?:json|md)", filename)
+    return match.group(1) if match else None
+
+
+def latest_report_file(domain: str) -> Optional[str]:
+    """指定领域最近一期报告的 JSON 路径（文件名形如 {时间戳}_{领域}.json）"""
+    for path in list_report_files(ext=".json"):
+        if report_timestamp(os.path.basename(path), domain):
+            return path
+    return None
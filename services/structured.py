@@ -0,0 +1,212 @@
+from __future__ import annotations
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# 步骤1/2 输出的默认结构约束（JSON Schema 子集：type / properties / required，以及扩展的 required_any）。
+# 领域可在 prompts.json 中通过 "step1_schema" / "step2_schema" 覆盖。
+DEFAULT_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "step1": {
+        "type": "object",
+        "properties": {
+            "pass": {"type": "boolean"},
+            "ignore": {"type": "boolean"},
+            "value": {"type": "number"},
+            "score": {"type": "number"},
+            "reason": {"type": "string"},
+        },
+        "required_any": ["pass", "value", "score", "ignore"],
+    },
+    "step2": {
+        "type": "object",
+        "properties": {
+            "title_cn": {"type": "string"},
+            "summary": {"type": "string"},
+            "one_sentence": {"type": "string"},
+            "score": {"type": "integer"},
+            "score_reason": {"type": "string"},
+            "category": {"type": "string"},
+            "keywords": {"type": "array", "items": {"type": "string"}},
+            "key_insight": {"type": "string"},
+            "reason": {"type": "string"},
+        },
+        "required": ["summary", "score"],
+    },
+}
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_TRUE = {"true", "yes", "y", "1", "pass", "是", "通过"}
+_FALSE = {"false", "no", "n", "0", "fail", "否", "不通过"}
+
+
+def get_schema(prompts: Dict, step: str) -> Dict[str, Any]:
+    return prompts.get(f"{step}_schema") or DEFAULT_SCHEMAS[step]
+
+
+def _close_json(text: str) -> str:
+    """补全被截断的 JSON：闭合字符串与括号，去掉悬空的逗号/冒号"""
+    stack: List[str] = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text += "\\" if escape else ""
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def parse_json_lenient(response_text: Optional[str]) -> Tuple[Dict, str]:
+    """容错解析 LLM 返回的 JSON 对象。返回 (数据, 状态)，状态为 ok / repaired / failed。
+    修复策略：去掉代码块标记与前后杂讯 → 补全截断 → 逐步回退到上一个逗号后重试。"""
+    if not response_text:
+        return {}, "failed"
+    text = response_text.replace("```json", "").replace("```", "").strip()
+    start = text.find("{")
+    if start < 0:
+        return {}, "failed"
+    text = text[start:]
+
+    try:
+        data, _ = json.JSONDecoder().raw_decode(text)
+        if isinstance(data, dict):
+            return data, "ok"
+    except ValueError:
+        pass
+
+    candidate = re.sub(r",\s*([}\]])", r"\1", text)
+    for _ in range(20):
+        try:
+            data = json.loads(_close_json(candidate))
+            if isinstance(data, dict):
+                return data, "repaired"
+        except ValueError:
+            pass
+        cut = candidate.rfind(",")
+        if cut <= 0:
+            break
+        candidate = candidate[:cut]
+    return {}, "failed"
+
+
+def _coerce(value: Any, spec: Dict[str, Any]) -> Tuple[Any, bool]:
+    """按字段类型做宽松转换，返回 (值, 是否成功)"""
+    kind = spec.get("type")
+    if value is None:
+        return None, False
+    if kind in ("integer", "number"):
+        if isinstance(value, bool):
+            return int(value), True
+        if isinstance(value, (int, float)):
+            return (int(round(value)) if kind == "integer" else value), True
+        match = _NUMBER_RE.search(str(value))
+        if not match:
+            return None, False
+        num = float(match.group())
+        return (int(round(num)) if kind == "integer" else num), True
+    if kind == "boolean":
+        if isinstance(value, bool):
+            return value, True
+        if isinstance(value, (int, float)):
+            return value > 0, True
+        text = str(value).strip().lower()
+        if text in _TRUE:
+            return True, True
+        if text in _FALSE:
+            return False, True
+        return None, False
+    if kind == "string":
+        if isinstance(value, list):
+            return "；".join(str(v) for v in value), True
+        if isinstance(value, dict):
+            return json.dumps(value, ensure_ascii=False), True
+        return str(value), True
+    if kind == "array":
+        if isinstance(value, str):
+            value = [v.strip() for v in re.split(r"[,，、;；]", value) if v.strip()]
+        if not isinstance(value, list):
+            return None, False
+        item_spec = spec.get("items")
+        if item_spec:
+            items = [_coerce(v, item_spec) for v in value]
+            value = [v for v, ok in items if ok]
+        return value, True
+    return value, True
+
+
+def coerce_to_schema(data: Dict, schema: Dict[str, Any]) -> Tuple[Dict, List[str]]:
+    """按 schema 转换字段类型。返回 (转换后的数据, 需要重新请求的字段)；无法转换的字段会被移除。"""
+    out = dict(data)
+    invalid: List[str] = []
+    props = schema.get("properties", {})
+    for name, spec in props.items():
+        if name not in out:
+            continue
+        value, ok = _coerce(out[name], spec)
+        if ok:
+            out[name] = value
+        else:
+            out.pop(name)
+            invalid.append(name)
+    missing = [name for name in schema.get("required", []) if name not in out and name not in invalid]
+    invalid.extend(missing)
+    any_of = schema.get("required_any", [])
+    if any_of and not any(name in out for name in any_of):
+        invalid.extend(name for name in any_of if name not in invalid)
+    return out, invalid
+
+
+def is_complete(data: Dict, schema: Dict[str, Any]) -> bool:
+    """必需字段齐全（required 全部存在，且 required_any 至少存在一个）"""
+    if any(name not in data for name in schema.get("required", [])):
+        return False
+    any_of = schema.get("required_any", [])
+    return not any_of or any(name in data for name in any_of)
+
+
+def field_repair_prompt(prompt: str, partial: Dict, fields: List[str], schema: Dict[str, Any]) -> str:
+    """只请求缺失/格式错误字段的补充提示词"""
+    props = schema.get("properties", {})
+    spec = {name: props.get(name, {}).get("type", "any") for name in fields}
+    return (
+        f"{prompt}\n\n"
+        f"你之前的回答已解析出以下字段：{json.dumps(partial, ensure_ascii=False)}\n"
+        f"但这些字段缺失或格式错误：{json.dumps(spec, ensure_ascii=False)}。\n"
+        "请只返回一个仅包含上述字段的 JSON 对象，字段类型必须与说明一致，不要输出其他内容。"
+    )
+
+
+class ParseStats:
+    """按步骤统计结构化输出的解析结果，写入报告 meta.parse_stats"""
+
+    FIELDS = ("calls", "ok", "repaired", "failed", "full_retries", "full_recovered", "field_retries", "field_recovered", "dropped")
+
+    def __init__(self):
+        self.steps: Dict[str, Dict[str, int]] = {}
+
+    def add(self, step: str, key: str, n: int = 1) -> None:
+        bucket = self.steps.setdefault(step, {k: 0 for k in self.FIELDS})
+        bucket[key] += n
+
+    def to_meta(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for step, counts in self.steps.items():
+            calls = counts["calls"] or 1
+            out[step] = {**counts, "failure_rate": round(counts["failed"] / calls, 3)}
+        return out
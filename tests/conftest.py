@@ -0,0 +1,97 @@
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+import core
+
+PROMPTS = {
+    "step1": "[STEP1] TITLE<<{title}>>\n{content}",
+    "step2": "[STEP2] TITLE<<{title}>>\n{content}",
+    "step3": "[STEP3] {context}",
+}
+_TITLE_RE = re.compile(r"TITLE<<(.*?)>>")
+
+
+def analysis(title, score=80):
+    return {
+        "title_cn": f"{title}（中文）",
+        "summary": f"{title} 的摘要",
+        "one_sentence": f"{title} 的看点",
+        "score": score,
+        "category": "TOOL",
+        "keywords": ["测试"],
+    }
+
+
+class StubLLM:
+    """OpenAI 客户端桩：按提示词中的步骤标记作答并记录提示词。
+    scores 指定各标题的步骤2 评分，replies 可按步骤提供依次返回的原始文本（用完后回到默认答案）。"""
+
+    def __init__(self, scores=None, replies=None, tokens=10):
+        self.scores = scores or {}
+        self.replies = {step: list(texts) for step, texts in (replies or {}).items()}
+        self.tokens = tokens
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        content = self._answer(prompt)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=self.tokens),
+        )
+
+    def _answer(self, prompt):
+        step = next((s for s in ("step1", "step2") if f"[{s.upper()}]" in prompt), "step3")
+        if self.replies.get(step):
+            return self.replies[step].pop(0)
+        if step == "step3":
+            return "# 本期简报"
+        title = _TITLE_RE.search(prompt).group(1)
+        if step == "step1":
+            return json.dumps({"pass": True, "value": 3})
+        return json.dumps(analysis(title, self.scores.get(title, 80)), ensure_ascii=False)
+
+    def count(self, step):
+        return sum(f"[{step.upper()}]" in p for p in self.prompts)
+
+
+def make_article(idx, source="feed-a"):
+    # 各篇正文用不同的词，避免被 Jaccard 去重合并
+    words = " ".join(f"w{idx}x{k}" for k in range(40))
+    return {
+        "title": f"文章{idx}",
+        "link": f"https://example.com/{idx}",
+        "pub_date": "2026-01-01 08:00",
+        "source": source,
+        "feed_id": 1,
+        "content_text": words,
+    }
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    client = StubLLM()
+    monkeypatch.setattr(core, "get_llm_client", lambda cfg: client)
+    return client
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    """替换 fetch_rss_articles：返回 feed 列表中未被 skip_links 跳过的文章副本"""
+    articles = []
+
+    def fetch(cfg, days=None, max_count=None, domain=None, skip_links=None):
+        return [dict(a) for a in articles if a["link"] not in (skip_links or set())]
+
+    monkeypatch.setattr(core, "fetch_rss_articles", fetch)
+    return articles
+
+
+@pytest.fixture
+def cfg():
+    return {"LLM_MODEL": "stub", "DEDUP_THRESHOLD": 0.65, "STEP3_RESERVE_TOKENS": 0}
@@ -0,0 +1,61 @@
+import pandas as pd
+from conftest import PROMPTS, make_article
+
+import core
+from services.budget import RunBudget
+from utils.analytics import source_expected_value
+
+
+def test_step1_share_leaves_budget_for_step2():
+    budget = RunBudget(max_calls=9, reserve_calls=1, step1_share=0.5)
+    budget.calls = 3
+    assert budget.exhausted(share=budget.step1_share) is None
+    budget.calls = 4
+    assert budget.exhausted(share=budget.step1_share) == "max_llm_calls"
+    assert budget.exhausted() is None
+
+
+def test_tight_budget_still_produces_analyzed_articles(llm, feed, cfg):
+    feed.extend(make_article(i) for i in range(6))
+
+    report = core.run_pipeline("Test", PROMPTS, cfg=dict(cfg, MAX_LLM_CALLS=5))
+
+    meta = report["meta"]
+    assert llm.count("step1") == 2
+    assert len(report["articles"]) == 2
+    assert llm.count("step3") == 1
+    assert report["global_summary"] == "# 本期简报"
+    assert meta["budget"]["llm_calls"] == 5
+    assert meta["budget"]["stopped_at"] == "step1"
+    assert meta["budget"]["skipped"] == {"step1": 4}
+
+
+def test_source_counts_exclude_unjudged_articles(llm, feed, cfg):
+    feed.extend(make_article(i, source="top") for i in range(2))
+    feed.extend(make_article(i, source="tail") for i in range(2, 6))
+
+    report = core.run_pipeline("Test", PROMPTS, cfg=dict(cfg, MAX_LLM_CALLS=5))
+
+    counts = report["meta"]["source_counts"]
+    assert counts["top"] == {"raw": 2, "judged": 2, "passed": 2, "analyzed": 2}
+    assert counts["tail"] == {"raw": 4, "judged": 0, "passed": 0, "analyzed": 0}
+
+
+def test_pass_rate_uses_judged_count():
+    frames = {
+        "articles": pd.DataFrame({"domain": ["D"] * 2, "source": ["a", "b"], "score": [80.0, 80.0]}),
+        "sources": pd.DataFrame(
+            {
+                "domain": ["D", "D"],
+                "source": ["a", "b"],
+                "raw": [10, 10],
+                "judged": [10, 2],
+                "passed": [5, 1],
+                "analyzed": [1, 1],
+            }
+        ),
+    }
+
+    values, _ = source_expected_value(frames, prior_weight=0)
+
+    assert values["a"] == values["b"]
@@ -0,0 +1,35 @@
+from core import TopCandidates
+
+
+def _article(idx, source):
+    return {"title": f"t{idx}", "link": f"https://example.com/{idx}", "pub_date": f"2026-01-01 00:{idx:02d}", "source": source}
+
+
+def test_high_value_feed_does_not_crowd_out_fresh_articles():
+    top = TopCandidates(4, source_values={"good": 3.0, "plain": 1.0}, half_life_hours=48)
+    for idx in range(6):
+        top.push(_article(idx, "good"), age_hours=120 + idx)
+    for idx in range(6, 8):
+        top.push(_article(idx, "plain"), age_hours=1)
+
+    sources = [a["source"] for a in top.result()]
+
+    assert sources[:2] == ["plain", "plain"]
+    assert sources.count("good") == 2
+
+
+def test_value_wins_between_equally_fresh_articles():
+    top = TopCandidates(1, source_values={"good": 3.0, "plain": 1.0})
+    top.push(_article(0, "plain"), age_hours=2)
+    top.push(_article(1, "good"), age_hours=2)
+
+    assert top.result()[0]["source"] == "good"
+
+
+def test_without_values_ranks_by_recency_and_caps_per_source():
+    top = TopCandidates(3, per_source_cap=1)
+    top.push(_article(0, "a"), age_hours=10)
+    top.push(_article(1, "a"), age_hours=1)
+    top.push(_article(2, "b"), age_hours=5)
+
+    assert [a["link"] for a in top.result()] == ["https://example.com/1", "https://example.com/2"]
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import pytest
+from freshrss_api import APIError
+
+from core import iter_unread_entries
+
+
+class StubFever:
+    """Fever API 客户端桩：unread_item_ids 列出全部 id，items 只返回仍存在的条目"""
+
+    def __init__(self, ids, deleted=(), fail_items=False):
+        self.ids = ids
+        self.deleted = set(deleted)
+        self.fail_items = fail_items
+        self.calls = []
+
+    def _call(self, endpoint="api", **params):
+        self.calls.append((endpoint, params))
+        if endpoint == "unread_item_ids":
+            return {"auth": 1, "unread_item_ids": ",".join(str(i) for i in self.ids)}
+        if self.fail_items:
+            raise APIError("API request failed after retry: stub down")
+        wanted = [int(i) for i in params["with_ids"].split(",")]
+        return {"auth": 1, "items": [{"id": i} for i in wanted if i not in self.deleted]}
+
+    @staticmethod
+    def _dict_to_item(item):
+        return SimpleNamespace(id=item["id"])
+
+
+def test_pages_newest_first_and_keeps_items_when_some_are_deleted():
+    client = StubFever(ids=range(1, 8), deleted={6})
+
+    items = list(iter_unread_entries(client, page_size=3))
+
+    assert [i.id for i in items] == [7, 5, 4, 3, 2, 1]
+    assert [p["with_ids"] for _, p in client.calls[1:]] == ["7,6,5", "4,3,2", "1"]
+
+
+def test_request_failures_are_not_swallowed():
+    client = StubFever(ids=range(1, 4), fail_items=True)
+
+    with pytest.raises(APIError):
+        list(iter_unread_entries(client))
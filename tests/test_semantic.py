@@ -0,0 +1,150 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from services import semantic
+from services.budget import RunBudget
+from services.semantic import EmbeddingCache, cluster_articles, embed_texts, local_embed
+
+PARAPHRASE = (
+    "华大团队发布单细胞RNA测序分析新工具，可更准确识别细胞类型",
+    "华大研究团队推出新的单细胞RNA测序分析工具，能够更准确地识别细胞类型",
+)
+UNRELATED = "美联储宣布加息25个基点，市场波动加剧"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _article(idx, title):
+    return {"title": title, "content_text": title, "link": f"https://example.com/{idx}", "source": f"feed-{idx}"}
+
+
+class StubEmbeddings:
+    """OpenAI 兼容 embeddings 接口桩：用本地哈希嵌入作答，记录调用的批次"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def create(self, model, input):  # noqa: A002
+        self.batches.append(list(input))
+        if self.fail:
+            raise RuntimeError("stub embeddings down")
+        data = [SimpleNamespace(index=i, embedding=v.tolist()) for i, v in enumerate(local_embed(input))]
+        return SimpleNamespace(data=list(reversed(data)), usage=None)
+
+
+def _client(fail=False):
+    return SimpleNamespace(embeddings=StubEmbeddings(fail=fail))
+
+
+def test_local_embed_is_normalized_and_deterministic():
+    vectors = local_embed([*PARAPHRASE, UNRELATED, ""])
+    assert vectors.shape == (4, semantic.LOCAL_DIM)
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, atol=1e-5)
+    assert not vectors[3].any()
+    assert np.array_equal(vectors, local_embed([*PARAPHRASE, UNRELATED, ""]))
+    assert vectors[0] @ vectors[1] > 0.6 > vectors[0] @ vectors[2]
+
+
+def test_cluster_articles_merges_paraphrase_into_related():
+    articles = [_article(0, PARAPHRASE[0]), _article(1, UNRELATED), _article(2, PARAPHRASE[1])]
+    vectors = local_embed([semantic.article_text(a) for a in articles])
+
+    reps = cluster_articles(articles, vectors, threshold=0.6)
+
+    assert [r["link"] for r in reps] == [articles[0]["link"], articles[1]["link"]]
+    assert reps[0]["related"] == [
+        {"title": PARAPHRASE[1], "link": articles[2]["link"], "source": articles[2]["source"]}
+    ]
+    assert "related" not in reps[1]
+
+
+def test_cluster_articles_does_not_mutate_existing_related():
+    old_related = [{"title": "旧", "link": "https://example.com/old", "source": "feed"}]
+    rep = dict(_article(0, PARAPHRASE[0]), related=old_related)
+    articles = [rep, _article(1, PARAPHRASE[1])]
+
+    reps = cluster_articles(articles, local_embed([semantic.article_text(a) for a in articles]), threshold=0.6)
+
+    assert len(reps[0]["related"]) == 2
+    assert len(old_related) == 1
+
+
+def test_embedding_cache_round_trip():
+    cache = EmbeddingCache("bge/m3:latest")
+    vector = local_embed(["缓存测试"])[0]
+    cache.put(EmbeddingCache.key("缓存测试"), vector)
+    cache.save()
+
+    reloaded = EmbeddingCache("bge/m3:latest")
+    assert reloaded.path == cache.path
+    assert np.array_equal(reloaded.get(EmbeddingCache.key("缓存测试")), vector)
+    assert reloaded.get(EmbeddingCache.key("不存在")) is None
+
+
+def test_embedding_cache_keeps_most_recent_entries():
+    cache = EmbeddingCache("remote-model", max_entries=2)
+    vectors = local_embed(["一", "二", "三"])
+    for text, vec in zip(["一", "二", "三"], vectors):
+        cache.put(EmbeddingCache.key(text), vec)
+    cache.put(EmbeddingCache.key("一"), vectors[0])
+    cache.save()
+
+    reloaded = EmbeddingCache("remote-model", max_entries=2)
+    assert len(reloaded) == 2
+    assert reloaded.get(EmbeddingCache.key("二")) is None
+    assert reloaded.get(EmbeddingCache.key("一")) is not None
+
+
+def test_local_model_is_not_cached(cache_dir):
+    vectors = embed_texts([*PARAPHRASE], None, None)
+
+    assert np.array_equal(vectors, local_embed([*PARAPHRASE]))
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_embed_texts_remote_uses_cache_and_batches():
+    client = _client()
+    texts = [*PARAPHRASE, UNRELATED]
+
+    first = embed_texts(texts, client, "remote-model", batch_size=2)
+    second = embed_texts(texts, client, "remote-model", batch_size=2)
+
+    assert [len(b) for b in client.embeddings.batches] == [2, 1]
+    assert np.allclose(first, local_embed(texts), atol=1e-6)
+    assert np.array_equal(first, second)
+
+
+def test_embed_texts_falls_back_to_local_on_remote_error():
+    client = _client(fail=True)
+    texts = [*PARAPHRASE, UNRELATED]
+
+    vectors = embed_texts(texts, client, "remote-model")
+
+    assert len(client.embeddings.batches) == 1
+    assert np.allclose(vectors, local_embed(texts), atol=1e-6)
+    assert EmbeddingCache("remote-model").get(EmbeddingCache.key(texts[0])) is None
+
+
+def test_embed_texts_charges_budget_and_stops_when_exhausted():
+    client = _client()
+    texts = [*PARAPHRASE, UNRELATED]
+    budget = RunBudget(max_calls=3, reserve_calls=1)
+
+    vectors = embed_texts(texts, client, "remote-model", batch_size=1, budget=budget)
+
+    assert len(client.embeddings.batches) == 2
+    assert budget.calls == 2
+    assert np.allclose(vectors, local_embed(texts), atol=1e-6)
+    # 已付费的两批写入缓存，再次运行只请求剩余文本
+    cache = EmbeddingCache("remote-model")
+    assert [cache.get(EmbeddingCache.key(t)) is not None for t in texts] == [True, True, False]
+
+    embed_texts(texts, client, "remote-model", batch_size=1)
+    assert client.embeddings.batches[2:] == [[texts[2]]]
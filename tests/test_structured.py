@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from conftest import StubLLM, analysis
+
+from core import _chat_structured
+from services.structured import DEFAULT_SCHEMAS, ParseStats, _coerce, coerce_to_schema, parse_json_lenient
+
+STEP2 = DEFAULT_SCHEMAS["step2"]
+
+
+@pytest.mark.parametrize(
+    "text, expected, status",
+    [
+        ('{"score": 80, "summary": "ok"}', {"score": 80, "summary": "ok"}, "ok"),
+        ('```json\n{"score": 80}\n```', {"score": 80}, "ok"),
+        ('好的，结果如下：{"score": 80} 以上', {"score": 80}, "ok"),
+        ('{"score": 80, "keywords": ["a", "b",],}', {"score": 80, "keywords": ["a", "b"]}, "repaired"),
+        ('{"score": 80, "summary": "被截断的摘', {"score": 80, "summary": "被截断的摘"}, "repaired"),
+        ('{"score": 80, "keywords": ["a", "b"', {"score": 80, "keywords": ["a", "b"]}, "repaired"),
+        ('{"score": 80, "summary":', {"score": 80, "summary": None}, "repaired"),
+        ('{"summary": "他说\\"好\\"', {"summary": '他说"好"'}, "repaired"),
+        ('{"summary": "末尾是转义\\', {"summary": "末尾是转义\\"}, "repaired"),
+        ("没有 JSON", {}, "failed"),
+        ("", {}, "failed"),
+        (None, {}, "failed"),
+    ],
+)
+def test_parse_json_lenient(text, expected, status):
+    assert parse_json_lenient(text) == (expected, status)
+
+
+@pytest.mark.parametrize(
+    "value, spec, expected",
+    [
+        ("85分", {"type": "integer"}, (85, True)),
+        ("8.6/10", {"type": "integer"}, (9, True)),
+        ("7.5", {"type": "number"}, (7.5, True)),
+        (True, {"type": "integer"}, (1, True)),
+        ("无", {"type": "integer"}, (None, False)),
+        ("通过", {"type": "boolean"}, (True, True)),
+        ("No", {"type": "boolean"}, (False, True)),
+        (0, {"type": "boolean"}, (False, True)),
+        ("也许", {"type": "boolean"}, (None, False)),
+        (["要点一", "要点二"], {"type": "string"}, ("要点一；要点二", True)),
+        ("DNA, RNA，蛋白", {"type": "array", "items": {"type": "string"}}, (["DNA", "RNA", "蛋白"], True)),
+        (None, {"type": "string"}, (None, False)),
+    ],
+)
+def test_coerce(value, spec, expected):
+    assert _coerce(value, spec) == expected
+
+
+def test_coerce_to_schema_reports_invalid_and_missing_fields():
+    data, invalid = coerce_to_schema({"score": "高", "keywords": "a、b"}, STEP2)
+    assert data == {"keywords": ["a", "b"]}
+    assert invalid == ["score", "summary"]
+
+
+def _run(client, stats):
+    return _chat_structured(client, "stub", "[STEP2] TITLE<<T>>\n正文", STEP2, "step2", stats=stats)
+
+
+def test_field_repair_only_requests_invalid_fields():
+    full = analysis("T")
+    first = dict(full, score="不确定")
+    client = StubLLM(replies={"step2": [json.dumps(first, ensure_ascii=False), '{"score": "88分"}']})
+    stats = ParseStats()
+
+    data = _run(client, stats)
+
+    assert data == dict(full, score=88)
+    assert len(client.prompts) == 2
+    assert '"score": "integer"' in client.prompts[1]
+    assert stats.steps["step2"]["field_retries"] == 1
+    assert stats.steps["step2"]["field_recovered"] == 1
+
+
+def test_unparseable_reply_requests_full_analysis_again():
+    client = StubLLM(replies={"step2": ["抱歉，我无法回答"]})
+    stats = ParseStats()
+
+    data = _run(client, stats)
+
+    assert data == analysis("T")
+    assert client.prompts[1] == client.prompts[0]
+    counts = stats.steps["step2"]
+    assert (counts["failed"], counts["full_retries"], counts["full_recovered"], counts["field_retries"]) == (1, 1, 1, 0)
+
+
+def test_drops_article_when_retry_still_incomplete():
+    client = StubLLM(replies={"step2": ["不是 JSON", '{"summary": "只有摘要"}']})
+    stats = ParseStats()
+
+    assert _run(client, stats) == {}
+    assert len(client.prompts) == 2
+    assert stats.steps["step2"]["dropped"] == 1
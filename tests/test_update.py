@@ -0,0 +1,95 @@
+import copy
+import json
+
+from conftest import PROMPTS, make_article
+
+import core
+from utils.reporting import generate_markdown_report, patch_markdown_report
+
+
+def _first_issue(feed, cfg):
+    feed.extend(make_article(i) for i in range(2))
+    return core.run_pipeline("Test", PROMPTS, cfg=cfg)
+
+
+def test_update_merges_new_articles_and_skips_seen(llm, feed, cfg):
+    base = _first_issue(feed, cfg)
+    snapshot = json.dumps(base, sort_keys=True)
+    feed.append(make_article(2))
+    llm.prompts.clear()
+
+    updated = core.update_pipeline(base, PROMPTS, cfg=cfg)
+
+    step1_prompts = [p for p in llm.prompts if "[STEP1]" in p]
+    assert len(step1_prompts) == 1 and "文章2" in step1_prompts[0]
+    assert [a["link"] for a in updated["articles"]] == [a["link"] for a in feed]
+    assert set(updated["meta"]["seen_links"]) == {a["link"] for a in feed}
+    assert updated["meta"]["updates"] == 1
+    assert updated["meta"]["last_update"]["new_raw"] == 1
+    assert json.dumps(base, sort_keys=True) == snapshot
+
+
+def test_update_keeps_summary_when_top_n_unchanged(llm, feed, cfg):
+    cfg = dict(cfg, STEP3_TOP_N=2)
+    base = _first_issue(feed, cfg)
+    feed.append(make_article(2))
+    llm.scores["文章2"] = 50
+    llm.prompts.clear()
+
+    updated = core.update_pipeline(base, PROMPTS, cfg=cfg)
+
+    assert llm.count("step3") == 0
+    assert updated["global_summary"] == base["global_summary"]
+    assert updated["meta"]["last_update"]["summary_regenerated"] is False
+    assert updated["articles"][-1]["link"] == feed[2]["link"]
+
+
+def test_update_regenerates_summary_when_top_n_changes(llm, feed, cfg):
+    cfg = dict(cfg, STEP3_TOP_N=2)
+    base = _first_issue(feed, cfg)
+    feed.append(make_article(2))
+    llm.scores["文章2"] = 95
+    llm.prompts.clear()
+
+    updated = core.update_pipeline(base, PROMPTS, cfg=cfg)
+
+    assert llm.count("step3") == 1
+    assert updated["meta"]["last_update"]["summary_regenerated"] is True
+    assert updated["articles"][0]["link"] == feed[2]["link"]
+
+
+def test_patch_round_trip_is_identity(llm, feed, cfg):
+    report = _first_issue(feed, cfg)
+    md = generate_markdown_report(report)
+
+    assert patch_markdown_report(md, report, report) == md
+
+
+def test_patch_keeps_hand_edits_and_renders_new_articles(llm, feed, cfg):
+    cfg = dict(cfg, STEP3_TOP_N=2)
+    base = _first_issue(feed, cfg)
+    md = generate_markdown_report(base)
+    edited = md.replace("# 本期简报", "# 手工改写的总结").replace("文章0 的看点", "文章0 的看点（编辑补充）")
+    feed.append(make_article(2))
+    llm.scores["文章2"] = 50
+
+    updated = core.update_pipeline(base, PROMPTS, cfg=cfg)
+    patched = patch_markdown_report(edited, updated, base)
+
+    assert "# 手工改写的总结" in patched
+    assert "文章0 的看点（编辑补充）" in patched
+    assert "### 3. 文章2（中文）" in patched
+    assert "🔄 Updated:" in patched
+    assert patched.replace("# 手工改写的总结", "# 本期简报").replace("（编辑补充）", "") == generate_markdown_report(updated)
+
+
+def test_patch_rerenders_article_with_new_related_link(llm, feed, cfg):
+    base = _first_issue(feed, cfg)
+    md = generate_markdown_report(base)
+    updated = copy.deepcopy(base)
+    updated["articles"][0]["related"] = [{"title": "转载", "link": "https://example.com/r", "source": "feed-b"}]
+
+    patched = patch_markdown_report(md, updated, base)
+
+    assert "[转载](https://example.com/r)" in patched
+    assert patched == generate_markdown_report(updated)
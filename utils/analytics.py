@@ -0,0 +1,245 @@
+from __future__ import annotations
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.store import CACHE_DIR, list_report_files
+
+# 历史报告的列式视图：reports(每期一行) / articles(每篇文章一行) / sources(每期每个源一行)
+# 缓存于 data/cache，按报告文件的 mtime 增量追加；报告被删除或改写时对应行自动失效。
+TABLES = ("reports", "articles", "sources")
+
+REPORT_COLUMNS = ["report_id", "report_mtime", "domain", "issue_date", "total_raw", "total_unique", "total_passed"]
+ARTICLE_COLUMNS = ["report_id", "domain", "issue_date", "title", "link", "source", "pub_date", "category", "score", "keywords"]
+# judged：得到步骤1 结论的文章数，作为通过率的分母（旧报告没有该字段时取 raw）
+SOURCE_COLUMNS = ["report_id", "domain", "issue_date", "source", "raw", "judged", "passed", "analyzed"]
+
+_COLUMNS = {"reports": REPORT_COLUMNS, "articles": ARTICLE_COLUMNS, "sources": SOURCE_COLUMNS}
+
+try:
+    import pyarrow  # noqa: F401
+    _CACHE_EXT = ".parquet"
+except Exception:
+    _CACHE_EXT = ".pkl"
+
+
+def _cache_path(name: str) -> str:
+    return os.path.join(CACHE_DIR, f"history_{name}{_CACHE_EXT}")
+
+
+def _read_table(name: str) -> Optional[pd.DataFrame]:
+    path = _cache_path(name)
+    if not os.path.exists(path):
+        return None
+    try:
+        if _CACHE_EXT == ".parquet":
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+    except Exception:
+        return None
+
+
+def _write_table(name: str, df: pd.DataFrame) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(name)
+    try:
+        if _CACHE_EXT == ".parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_pickle(path)
+    except Exception as e:
+        print(f"历史缓存写入失败: {e}")
+
+
+def _normalize_keywords(kws) -> List[str]:
+    # 从 Parquet 缓存读回时列表单元格为 numpy.ndarray，按任意非字符串序列处理
+    if isinstance(kws, str):
+        return [kws.strip()] if kws.strip() else []
+    if isinstance(kws, (list, tuple, np.ndarray)):
+        return [str(k).strip() for k in kws if str(k).strip()]
+    return []
+
+
+def _report_rows(report_id: str, mtime: float, report: Dict) -> Dict[str, List[Dict]]:
+    """将单份报告展开为三张表的行"""
+    meta = report.get("meta", {})
+    domain = meta.get("domain", "")
+    issue_date = meta.get("date", "")
+
+    rows: Dict[str, List[Dict]] = {name: [] for name in TABLES}
+    rows["reports"].append(
+        {
+            "report_id": report_id,
+            "report_mtime": mtime,
+            "domain": domain,
+            "issue_date": issue_date,
+            "total_raw": meta.get("total_raw", 0),
+            "total_unique": meta.get("total_unique", 0),
+            "total_passed": meta.get("total_passed", 0),
+        }
+    )
+    for art in report.get("articles", []):
+        ai = art.get("ai_analysis", {})
+        rows["articles"].append(
+            {
+                "report_id": report_id,
+                "domain": domain,
+                "issue_date": issue_date,
+                "title": art.get("title", ""),
+                "link": art.get("link", ""),
+                "source": art.get("source", "Unknown"),
+                "pub_date": art.get("pub_date", ""),
+                "category": ai.get("category", "OTHER"),
+                "score": ai.get("score"),
+                "keywords": _normalize_keywords(ai.get("keywords", [])),
+            }
+        )
+    for source, counts in (meta.get("source_counts") or {}).items():
+        rows["sources"].append(
+            {
+                "report_id": report_id,
+                "domain": domain,
+                "issue_date": issue_date,
+                "source": source,
+                "raw": counts.get("raw", 0),
+                "judged": counts.get("judged", counts.get("raw", 0)),
+                "passed": counts.get("passed", 0),
+                "analyzed": counts.get("analyzed", 0),
+            }
+        )
+    return rows
+
+
+def _finalize(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """统一列类型，保证后续向量化计算无需再做容错"""
+    df = df.reindex(columns=_COLUMNS[name])
+    df["issue_date"] = pd.to_datetime(df["issue_date"], errors="coerce")
+    if name == "reports":
+        for col in ("total_raw", "total_unique", "total_passed"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+        df["report_mtime"] = pd.to_numeric(df["report_mtime"], errors="coerce")
+    elif name == "articles":
+        df["score"] = pd.to_numeric(df["score"], errors="coerce")
+        df["category"] = df["category"].fillna("OTHER").astype(str)
+        df["source"] = df["source"].fillna("Unknown").astype(str)
+        df["keywords"] = df["keywords"].map(_normalize_keywords)
+    elif name == "sources":
+        for col in ("raw", "judged", "passed", "analyzed"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+    return df.reset_index(drop=True)
+
+
+def load_history_frames(refresh: bool = False) -> Dict[str, pd.DataFrame]:
+    """加载全部历史报告的列式表（增量更新缓存）。refresh=True 时忽略缓存全量重建。"""
+    current: Dict[str, tuple] = {}
+    for path in list_report_files(ext=".json"):
+        report_id = os.path.splitext(os.path.basename(path))[0]
+        current[report_id] = (path, os.path.getmtime(path))
+
+    cached = {} if refresh else {name: _read_table(name) for name in TABLES}
+    # 缺表或列结构已变化（旧版本缓存）时全量重建
+    if any(cached.get(name) is None or not set(_COLUMNS[name]) <= set(cached[name].columns) for name in TABLES):
+        cached = {name: pd.DataFrame(columns=_COLUMNS[name]) for name in TABLES}
+
+    known = cached["reports"].set_index("report_id")["report_mtime"].to_dict()
+    fresh_ids = [rid for rid, (_, mtime) in current.items() if known.get(rid) == mtime]
+    stale_ids = [rid for rid in current if rid not in fresh_ids]
+    unchanged = len(stale_ids) == 0 and len(known) == len(fresh_ids)
+
+    frames = {name: cached[name][cached[name]["report_id"].isin(fresh_ids)] for name in TABLES}
+    if unchanged:
+        return {name: _finalize(name, df) for name, df in frames.items()}
+
+    new_rows: Dict[str, List[Dict]] = {name: [] for name in TABLES}
+    for rid in stale_ids:
+        path, mtime = current[rid]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except Exception:
+            continue
+        for name, rows in _report_rows(rid, mtime, report).items():
+            new_rows[name].extend(rows)
+
+    result: Dict[str, pd.DataFrame] = {}
+    for name in TABLES:
+        parts = [df for df in (frames[name], pd.DataFrame(new_rows[name], columns=_COLUMNS[name])) if not df.empty]
+        merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=_COLUMNS[name])
+        result[name] = _finalize(name, merged)
+        _write_table(name, result[name])
+    return result
+
+
+def issue_trend(reports: pd.DataFrame) -> pd.DataFrame:
+    """每期抓取/去重/通过数量，按日期升序"""
+    cols = ["issue_date", "domain", "total_raw", "total_unique", "total_passed"]
+    return reports[cols].dropna(subset=["issue_date"]).sort_values("issue_date").reset_index(drop=True)
+
+
+def category_trends(articles: pd.DataFrame, freq: str = "D") -> pd.DataFrame:
+    """类别随时间的分布：返回 (period, category, count) 长表，freq 为 pandas 频率字符串"""
+    df = articles.dropna(subset=["issue_date"])
+    if df.empty:
+        return pd.DataFrame(columns=["period", "category", "count"])
+    grouped = df.groupby([pd.Grouper(key="issue_date", freq=freq), "category"]).size()
+    out = grouped[grouped > 0].reset_index(name="count")
+    return out.rename(columns={"issue_date": "period"})
+
+
+def source_quality(articles: pd.DataFrame, sources: pd.DataFrame) -> pd.DataFrame:
+    """按订阅源统计：入选文章数、平均分，以及（有源计数的报告中）初筛通过率"""
+    per_article = articles.groupby("source").agg(
+        analyzed=("link", "size"),
+        avg_score=("score", "mean"),
+    )
+    per_source = sources.groupby("source")[["raw", "judged", "passed"]].sum()
+    out = per_article.join(per_source, how="outer")
+    cols = ["analyzed", "raw", "judged", "passed"]
+    out[cols] = out[cols].fillna(0).astype("int64")
+    out["pass_rate"] = (out["passed"] / out["judged"].where(out["judged"] > 0)).astype("float64")
+    return out.reset_index().sort_values(["analyzed", "avg_score"], ascending=False).reset_index(drop=True)
+
+
+def source_expected_value(frames: Dict[str, pd.DataFrame], domain: Optional[str] = None, prior_weight: float = 5.0) -> Tuple[pd.Series, float]:
+    """订阅源期望价值 = 平滑后的初筛通过率 × 平滑后的相对平均分（全局均分为 1）。
+    样本少的源向全局先验收缩，prior_weight 为先验的等效样本数。返回 (source -> 价值, 未知源的先验价值)。"""
+    articles, sources = frames["articles"], frames["sources"]
+    if domain:
+        articles = articles[articles["domain"] == domain]
+        sources = sources[sources["domain"] == domain]
+
+    judged_total = sources["judged"].sum()
+    global_pass = float(sources["passed"].sum() / judged_total) if judged_total > 0 else 1.0
+    global_score = float(articles["score"].mean()) if articles["score"].notna().any() else 1.0
+    global_score = global_score or 1.0
+
+    scores = articles.groupby("source")["score"].agg(["sum", "count"])
+    counts = sources.groupby("source")[["judged", "passed"]].sum()
+    stats = scores.join(counts, how="outer").fillna(0)
+    if stats.empty:
+        return pd.Series(dtype="float64"), global_pass
+
+    pass_rate = (stats["passed"] + prior_weight * global_pass) / (stats["judged"] + prior_weight)
+    mean_score = (stats["sum"] + prior_weight * global_score) / (stats["count"] + prior_weight)
+    return (pass_rate * mean_score / global_score).astype("float64"), global_pass
+
+
+def keyword_frequency(articles: pd.DataFrame, top: Optional[int] = 30) -> pd.DataFrame:
+    """关键词出现频次（每篇文章的关键词列表展开后计数）"""
+    kws = articles["keywords"].explode().dropna()
+    counts = kws[kws != ""].value_counts()
+    if top:
+        counts = counts.head(top)
+    return counts.rename_axis("keyword").reset_index(name="count")
+
+
+def score_distribution(articles: pd.DataFrame, bins: int = 10) -> pd.DataFrame:
+    """评分分布直方：返回 (bucket, count)，按报告中实际出现的分值区间等宽分桶"""
+    scores = articles["score"].dropna()
+    if scores.empty:
+        return pd.DataFrame(columns=["bucket", "count"])
+    counts = pd.cut(scores, bins=bins, include_lowest=True, precision=0).value_counts(sort=False)
+    return pd.DataFrame({"bucket": counts.index.astype(str), "count": counts.to_numpy()})
@@ -1,53 +1,117 @@
 from __future__ import annotations
 import json
 import os
-from typing import Dict, List, Tuple
+import re
+from typing import Dict, List
 
 from services.store import REPORTS_DIR
 
 
-def generate_markdown_report(report_data: Dict) -> str:
-    """将报告数据转换为 Markdown 格式字符串"""
-    meta = report_data.get("meta", {})
-    summary = report_data.get("global_summary", "暂无总结")
-    articles = report_data.get("articles", [])
+SUMMARY_HEADING = "## 📰 本期看点 (Executive Summary)"
+ARTICLES_HEADING = "## 📚 精选文章 (Selected Articles)\n"
+FOOTER = "\n*Generated by AI RSS Flow*"
+
+_BLOCK_START = re.compile(r"(?m)^(?=### \d+\. )")
+_BLOCK_NUMBER = re.compile(r"^### \d+\. ")
+_BLOCK_LINK = re.compile(r"(?m)^\*\*🔗 原文链接\*\*: \[.*\]\((.*)\)$")
+
+
+def _render_header(meta: Dict) -> List[str]:
+    header = [f"# 🧬 {meta.get('domain', 'RSS')} AI Daily Brief"]
+    updated = f" | 🔄 Updated: {meta.get('updated')}" if meta.get("updated") else ""
+    header.append(f"> 📅 Date: {meta.get('date')}{updated} | 📊 Passed: {meta.get('total_passed')}/{meta.get('total_raw')}\n")
+    return header
+
+
+def _render_article(idx: int, art: Dict) -> str:
+    """单篇文章的 Markdown 块（以分隔线结尾）"""
+    ai = art.get("ai_analysis", {})
+    title_cn = ai.get("title_cn", art.get("title"))
+    score = ai.get("score", 0)
+
+    score_icon = "🌟" if score >= 9 else ("🔥" if score >= 7 else "📄")
 
     md_lines: List[str] = []
-    md_lines.append(f"# 🧬 {meta.get('domain', 'RSS')} AI Daily Brief")
-    md_lines.append(f"> 📅 Date: {meta.get('date')} | 📊 Passed: {meta.get('total_passed')}/{meta.get('total_raw')}\n")
+    md_lines.append(f"### {idx}. {title_cn} {score_icon} {score}")
+    md_lines.append(f"**🔗 原文链接**: [{art.get('title')}]({art.get('link')})")
+    if ai.get("one_sentence"):
+        md_lines.append(f"**📌 一句话看点**: {ai.get('one_sentence')}")
+
+    kws = ai.get("keywords", [])
+    if isinstance(kws, list):
+        kw_text = ", ".join(kws)
+    else:
+        kw_text = str(kws)
+    md_lines.append(f"**🏷️ 标签**: {kw_text}")
+    md_lines.append(f"**📝 摘要**: {ai.get('summary', '无')}")
+
+    related = art.get("related", [])
+    if related:
+        links = "; ".join(f"[{r.get('title')}]({r.get('link')})" for r in related)
+        md_lines.append(f"**🔗 相关报道**: {links}")
+
+    if ai.get("reason"):
+        md_lines.append(f"> *💡 评分依据: {ai.get('reason')}*")
+
+    md_lines.append("\n---\n")
+    return "\n".join(md_lines)
+
 
-    md_lines.append("## 📰 本期看点 (Executive Summary)")
+def _assemble(meta: Dict, summary: str, blocks: List[str]) -> str:
+    md_lines: List[str] = _render_header(meta)
+    md_lines.append(SUMMARY_HEADING)
     md_lines.append(summary)
     md_lines.append("\n---\n")
-    md_lines.append("## 📚 精选文章 (Selected Articles)\n")
+    md_lines.append(ARTICLES_HEADING)
+    md_lines.extend(blocks)
+    md_lines.append(FOOTER)
+    return "\n".join(md_lines)
 
-    for idx, art in enumerate(articles, 1):
-        ai = art.get("ai_analysis", {})
-        title_cn = ai.get("title_cn", art.get("title"))
-        score = ai.get("score", 0)
 
-        score_icon = "🌟" if score >= 9 else ("🔥" if score >= 7 else "📄")
+def generate_markdown_report(report_data: Dict) -> str:
+    """将报告数据转换为 Markdown 格式字符串"""
+    meta = report_data.get("meta", {})
+    summary = report_data.get("global_summary", "暂无总结")
+    articles = report_data.get("articles", [])
+    return _assemble(meta, summary, [_render_article(idx, art) for idx, art in enumerate(articles, 1)])
 
-        md_lines.append(f"### {idx}. {title_cn} {score_icon} {score}")
-        md_lines.append(f"**🔗 原文链接**: [{art.get('title')}]({art.get('link')})")
-        if ai.get("one_sentence"):
-            md_lines.append(f"**📌 一句话看点**: {ai.get('one_sentence')}")
 
-        kws = ai.get("keywords", [])
-        if isinstance(kws, list):
-            kw_text = ", ".join(kws)
-        else:
-            kw_text = str(kws)
-        md_lines.append(f"**🏷️ 标签**: {kw_text}")
-        md_lines.append(f"**📝 摘要**: {ai.get('summary', '无')}")
+def patch_markdown_report(md_text: str, report_data: Dict, previous: Dict) -> str:
+    """在已有 Markdown 上增量更新：沿用未变化的文章块与总结段落（保留手工修改），
+    只渲染新增/变化的文章并重新编号、刷新头部统计。结构无法识别时退回完整生成。"""
+    summary_marker = SUMMARY_HEADING + "\n"
+    articles_marker = "\n\n---\n\n" + ARTICLES_HEADING
+    s_idx = md_text.find(summary_marker)
+    a_idx = md_text.find(articles_marker, s_idx + 1)
+    f_idx = md_text.rfind("\n" + FOOTER)
+    if s_idx < 0 or a_idx < 0 or f_idx < a_idx:
+        return generate_markdown_report(report_data)
 
-        if ai.get("reason"):
-            md_lines.append(f"> *💡 评分依据: {ai.get('reason')}*")
+    summary = report_data.get("global_summary", "暂无总结")
+    if summary == previous.get("global_summary"):
+        summary = md_text[s_idx + len(summary_marker) : a_idx]
 
-        md_lines.append("\n---\n")
+    old_blocks: Dict[str, str] = {}
+    for part in _BLOCK_START.split(md_text[a_idx + len(articles_marker) : f_idx]):
+        if not _BLOCK_NUMBER.match(part):
+            continue
+        block = part[:-1] if part.endswith("\n\n") else part
+        link = _BLOCK_LINK.search(block)
+        if link:
+            old_blocks[link.group(1)] = block
+
+    previous_articles = {a.get("link"): a for a in previous.get("articles", [])}
+    blocks: List[str] = []
+    for idx, art in enumerate(report_data.get("articles", []), 1):
+        link = art.get("link")
+        old = previous_articles.get(link)
+        unchanged = old is not None and old.get("ai_analysis") == art.get("ai_analysis") and old.get("related") == art.get("related")
+        if unchanged and link in old_blocks:
+            blocks.append(_BLOCK_NUMBER.sub(f"### {idx}. ", old_blocks[link], count=1))
+        else:
+            blocks.append(_render_article(idx, art))
 
-    md_lines.append("\n*Generated by AI RSS Flow*")
-    return "\n".join(md_lines)
+    return _assemble(report_data.get("meta", {}), summary, blocks)
 
 
 def load_all_reports(limit: int | None = None) -> List[Dict]:
@@ -68,22 +132,19 @@ def load_all_reports(limit: int | None = None) -> List[Dict]:
     return reports
 
 
-def aggregate_history_stats(limit: int | None = 20) -> Dict:
-    """从历史报告中汇总统计（类别分布、每期文章数、总报告数等）"""
-    reports = load_all_reports(limit=limit)
-    category_count: Dict[str, int] = {}
-    per_issue_passed: List[Tuple[str, int]] = []
+def aggregate_history_stats(limit: int | None = None) -> Dict:
+    """从历史报告中汇总统计（类别分布、每期文章数、总报告数等）。limit 仅截取最近 N 期，默认统计全部归档。"""
+    from utils.analytics import load_history_frames
 
-    for r in reports:
-        meta = r.get("meta", {})
-        per_issue_passed.append((meta.get("date", ""), int(meta.get("total_passed", 0))))
-        for art in r.get("articles", []):
-            cat = art.get("ai_analysis", {}).get("category", "OTHER")
-            category_count[cat] = category_count.get(cat, 0) + 1
+    frames = load_history_frames()
+    reports = frames["reports"].sort_values("report_mtime", ascending=False)
+    if limit:
+        reports = reports.head(limit)
+    articles = frames["articles"][frames["articles"]["report_id"].isin(reports["report_id"])]
 
-    total_reports = len(reports)
+    per_issue = reports.sort_values("issue_date")
     return {
-        "category_count": category_count,
-        "per_issue_passed": per_issue_passed,
-        "total_reports": total_reports,
+        "category_count": articles["category"].value_counts().to_dict(),
+        "per_issue_passed": list(zip(per_issue["issue_date"].dt.strftime("%Y-%m-%d %H:%M").fillna(""), per_issue["total_passed"].tolist())),
+        "total_reports": len(reports),
     }